@@ -0,0 +1,161 @@
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from qiskit.qasm2 import dumps as qiskit_qasm_dumps
+
+# Both the Research scripts and the backend must resolve whatever directory the job is started from
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from Optimization import QuantumCircuitOptimizer
+from db.db_handler import dbhandles
+from services.algassertprod import QuantumCircuitGenerator
+from services.circuit_summary import CircuitSummary
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+JOB_VERSION = "1"
+CHECKPOINT_COLLECTION = "DEQODE_JOB_CHECKPOINTS"
+CIRCUIT_COLLECTION = "DEQODE_CIRCUIT_CAPTURE"
+# Documents holding at least one buildable circuit that the current JOB_VERSION has not optimized
+PENDING_QUERY = {"circuits": {"$elemMatch": {"Response": {"$type": "object"}, "optimized.job_version": {"$ne": JOB_VERSION}}}}
+
+_worker_optimizer: Optional[QuantumCircuitOptimizer] = None
+
+def _init_worker(size_threshold: Optional[int], zx_time_budget: Optional[float]) -> None:
+    global _worker_optimizer
+    _worker_optimizer = QuantumCircuitOptimizer(size_threshold=size_threshold, zx_time_budget=zx_time_budget)
+
+def _optimize_record(task: Tuple[Any, int, Dict[str, Any]]) -> Tuple[Any, int, Dict[str, Any]]:
+    """Rebuild one stored circuit from its gate JSON, optimize it and report the gate-count delta."""
+    doc_id, index, response = task
+    try:
+        circuit, _ = QuantumCircuitGenerator.generate_circuit_from_json(response)
+        has_measurements = circuit.count_ops().get("measure", 0) > 0
+        unitary_part = circuit.remove_final_measurements(inplace=False)
+        optimized = _worker_optimizer.optimize(unitary_part, input_format="qiskit")
+        if has_measurements:
+            optimized.measure_all()
+        original, reduced = CircuitSummary.from_circuit(circuit), CircuitSummary.from_circuit(optimized)
+        result = {
+            "qasm": qiskit_qasm_dumps(optimized),
+            "original_gates": original.total_gates,
+            "optimized_gates": reduced.total_gates,
+            "gate_delta": original.total_gates - reduced.total_gates,
+            "original_depth": original.depth,
+            "optimized_depth": reduced.depth,
+            "fingerprint": reduced.fingerprint,
+        }
+    except Exception as e:
+        result = {"error": str(e)}
+    result["job_version"] = JOB_VERSION
+    result["optimized_dt"] = datetime.now()
+    return doc_id, index, result
+
+class BulkCircuitOptimizer:
+    """Streams users' stored circuits through QuantumCircuitOptimizer and writes the results back.
+
+    Only documents with a circuit not yet optimized by the current ``JOB_VERSION`` are read, in
+    ``_id`` order, one batch at a time. After each batch's bulk write the last ``_id`` is saved in
+    ``DEQODE_JOB_CHECKPOINTS``, so an interrupted pass resumes where it stopped. A finished pass
+    clears the cursor, so the next run picks up circuits later pushed onto documents already seen.
+    """
+
+    def __init__(self, job_name: str = "bulk-circuit-optimization", batch_size: int = 50,
+                 workers: Optional[int] = None, size_threshold: Optional[int] = None, zx_time_budget: Optional[float] = 30.0):
+        database = dbhandles().database
+        self._circuits = database[CIRCUIT_COLLECTION]
+        self._checkpoints = database[CHECKPOINT_COLLECTION]
+        self._job_name = job_name
+        self._batch_size = batch_size
+        self._workers = workers or os.cpu_count() or 1
+        self._size_threshold = size_threshold
+        self._zx_time_budget = zx_time_budget
+
+    def load_checkpoint(self) -> Dict[str, Any]:
+        checkpoint = self._checkpoints.find_one({"_id": self._job_name}) or {"_id": self._job_name, "processed": 0}
+        if checkpoint.get("job_version", JOB_VERSION) != JOB_VERSION:
+            checkpoint.update(last_id=None, processed=0)
+        return checkpoint
+
+    def save_checkpoint(self, last_id: Any, processed: int) -> None:
+        self._checkpoints.update_one(
+            {"_id": self._job_name},
+            {"$set": {"last_id": last_id, "processed": processed, "job_version": JOB_VERSION, "updated_dt": datetime.now()}},
+            upsert=True
+        )
+
+    def reset_checkpoint(self) -> None:
+        self._checkpoints.delete_one({"_id": self._job_name})
+
+    def _stream_batches(self, last_id: Any, limit: Optional[int]):
+        query = dict(PENDING_QUERY, _id={"$gt": last_id}) if last_id is not None else PENDING_QUERY
+        cursor = self._circuits.find(query, {"circuits": 1}).sort("_id", 1).batch_size(self._batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        batch: List[Dict[str, Any]] = []
+        for document in cursor:
+            batch.append(document)
+            if len(batch) == self._batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _pending_tasks(batch: List[Dict[str, Any]]) -> List[Tuple[Any, int, Dict[str, Any]]]:
+        tasks = []
+        for document in batch:
+            for index, record in enumerate(document.get("circuits") or []):
+                if not isinstance(record, dict) or not isinstance(record.get("Response"), dict):
+                    continue
+                if (record.get("optimized") or {}).get("job_version") == JOB_VERSION:
+                    continue
+                tasks.append((document["_id"], index, record["Response"]))
+        return tasks
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, int]:
+        checkpoint = self.load_checkpoint()
+        processed = checkpoint.get("processed", 0)
+        stats = {"documents": 0, "circuits": 0, "failed": 0, "gates_saved": 0}
+        logging.info(f"Starting {self._job_name} after _id={checkpoint.get('last_id')} ({processed} documents done).")
+        with Pool(self._workers, initializer=_init_worker, initargs=(self._size_threshold, self._zx_time_budget)) as pool:
+            for batch in self._stream_batches(checkpoint.get("last_id"), limit):
+                updates = []
+                for doc_id, index, result in pool.imap_unordered(_optimize_record, self._pending_tasks(batch)):
+                    updates.append(UpdateOne({"_id": doc_id}, {"$set": {f"circuits.{index}.optimized": result}}))
+                    stats["circuits"] += 1
+                    if "error" in result:
+                        stats["failed"] += 1
+                    else:
+                        stats["gates_saved"] += result["gate_delta"]
+                if updates:
+                    self._circuits.bulk_write(updates, ordered=False)
+                processed += len(batch)
+                stats["documents"] += len(batch)
+                self.save_checkpoint(batch[-1]["_id"], processed)
+                logging.info(f"Checkpoint at _id={batch[-1]['_id']}: {stats}")
+        if limit is None or stats["documents"] < limit:
+            self.save_checkpoint(None, processed)
+            logging.info(f"{self._job_name} pass complete: {stats}")
+        return stats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Optimize every circuit stored in DEQODE_CIRCUIT_CAPTURE.")
+    parser.add_argument("--job-name", default="bulk-circuit-optimization")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--size-threshold", type=int, default=None, help="Override the tuned threshold rule")
+    parser.add_argument("--zx-time-budget", type=float, default=30.0)
+    parser.add_argument("--limit", type=int, default=None, help="Maximum number of user documents to process")
+    parser.add_argument("--reset", action="store_true", help="Ignore the saved checkpoint and start over")
+    args = parser.parse_args()
+
+    job = BulkCircuitOptimizer(args.job_name, args.batch_size, args.workers, args.size_threshold, args.zx_time_budget)
+    if args.reset:
+        job.reset_checkpoint()
+    print(job.run(limit=args.limit))
@@ -0,0 +1,64 @@
+import random
+import statistics
+import time
+from typing import Callable, Dict, List
+import cirq
+import numpy as np
+from qiskit import QuantumCircuit
+from Optimization import CircuitConverter
+
+# Gates every path can express (swap via the legacy QASM instructions), so the QASM round-trip is timed on the same circuits
+SINGLE_QUBIT_GATES = ["h", "x", "s", "t", "rx", "rz"]
+TWO_QUBIT_GATES = ["cx", "cz", "swap"]
+
+def build_random_circuit(num_qubits: int, num_gates: int, seed: int = 7) -> QuantumCircuit:
+    rng = random.Random(seed)
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        if rng.random() < 0.3:
+            a, b = rng.sample(range(num_qubits), 2)
+            getattr(qc, rng.choice(TWO_QUBIT_GATES))(a, b)
+        else:
+            name = rng.choice(SINGLE_QUBIT_GATES)
+            qubit = rng.randrange(num_qubits)
+            if name in ("rx", "rz"):
+                getattr(qc, name)(rng.uniform(0, 2 * np.pi), qubit)
+            else:
+                getattr(qc, name)(qubit)
+    return qc
+
+def time_call(func: Callable, argument, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def run_benchmark(sizes: List[int], num_qubits: int = 8, repeats: int = 5) -> List[Dict[str, float]]:
+    rows = []
+    for size in sizes:
+        qiskit_circuit = build_random_circuit(num_qubits, size)
+        cirq_circuit = CircuitConverter.qiskit_to_cirq(qiskit_circuit)
+        row = {
+            "gates": size,
+            "qiskit_to_cirq_direct": time_call(CircuitConverter.qiskit_to_cirq, qiskit_circuit, repeats),
+            "qiskit_to_cirq_qasm": time_call(CircuitConverter.to_cirq_via_qasm, qiskit_circuit, repeats),
+            "cirq_to_qiskit_direct": time_call(CircuitConverter.cirq_to_qiskit, cirq_circuit, repeats),
+            "cirq_to_qiskit_qasm": time_call(CircuitConverter.to_qiskit_via_qasm, cirq_circuit, repeats)
+        }
+        # The direct path must agree with the source circuit up to global phase
+        if num_qubits <= 10 and size <= 1000:
+            assert cirq.allclose_up_to_global_phase(
+                cirq.unitary(cirq_circuit),
+                cirq.unitary(CircuitConverter.qiskit_to_cirq(CircuitConverter.cirq_to_qiskit(cirq_circuit)))
+            )
+        rows.append(row)
+    return rows
+
+if __name__ == "__main__":
+    results = run_benchmark([10, 100, 1000, 5000, 20000])
+    print(f"{'gates':>8} | {'q->c direct':>12} | {'q->c qasm':>12} | {'c->q direct':>12} | {'c->q qasm':>12}")
+    for row in results:
+        print(f"{row['gates']:>8} | {row['qiskit_to_cirq_direct']:>11.4f}s | {row['qiskit_to_cirq_qasm']:>11.4f}s | "
+              f"{row['cirq_to_qiskit_direct']:>11.4f}s | {row['cirq_to_qiskit_qasm']:>11.4f}s")
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Dict, List
+import httpx
+
+# Run the backend offline first, e.g.
+#   DEQCODE_LLM_BACKEND=stub DEQCODE_LLM_LATENCY=1.5 DEQCODE_LLM_LATENCY_JITTER=1 uvicorn main:app
+# or DEQCODE_LLM_BACKEND=replay with DEQCODE_LLM_REPLAY_PATH pointing at recorded completions.
+STATEMENTS = [
+    "Generate random numbers with {n} qubits",
+    "Prepare a GHZ state on {n} qubits",
+    "Build a quantum Fourier transform over {n} qubits",
+    "Create a Bell pair and measure both qubits",
+    "Simulate a biased coin flip with probability {p}",
+]
+
+def make_statement(rng: random.Random, unique: bool) -> str:
+    statement = rng.choice(STATEMENTS).format(n=rng.randint(2, 6), p=round(rng.random(), 2))
+    return f"{statement} (run {rng.randrange(10**9)})" if unique else statement
+
+async def design(client: httpx.AsyncClient, url: str, statement: str, username: str, variety: bool) -> Dict[str, float]:
+    start = time.perf_counter()
+    response = await client.post(f"{url}/design-circuit", json={"statements": statement, "username": username, "variety": variety})
+    result = {"latency": time.perf_counter() - start, "ok": float(response.status_code == 200)}
+    # Server-Timing: "llm;dur=812.4, build;dur=3.1, ..." in milliseconds
+    for entry in response.headers.get("server-timing", "").split(","):
+        stage, _, duration = entry.strip().partition(";dur=")
+        if duration:
+            result[f"{stage}_ms"] = float(duration)
+    return result
+
+async def run_load(url: str, requests: int, concurrency: int, username: str, unique: bool, variety: bool, seed: int) -> List[Dict[str, float]]:
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=120, limits=limits) as client:
+        async def one(statement: str):
+            async with semaphore:
+                try:
+                    return await design(client, url, statement, username, variety)
+                except httpx.HTTPError:
+                    return {"latency": float("nan"), "ok": 0.0}
+        return await asyncio.gather(*(one(make_statement(rng, unique)) for _ in range(requests)))
+
+def summarize(results: List[Dict[str, float]], wall: float) -> Dict[str, float]:
+    latencies = sorted(r["latency"] for r in results if r["ok"])
+    percentile = lambda q: latencies[int(q * (len(latencies) - 1))] if latencies else float("nan")
+    return {
+        "requests": len(results),
+        "success_rate": sum(r["ok"] for r in results) / max(1, len(results)),
+        "throughput_rps": len(results) / wall,
+        "p50_s": percentile(0.5),
+        "p95_s": percentile(0.95),
+        "p99_s": percentile(0.99),
+        "mean_s": statistics.fmean(latencies) if latencies else float("nan"),
+        # Mean server-side time per stage over the requests that ran it
+        **{f"mean_{key}": statistics.fmean(r[key] for r in results if key in r)
+           for key in sorted({key for r in results for key in r if key.endswith("_ms")})},
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test /design-circuit against a backend running on the stub or replay LLM.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--username", default="loadtest")
+    parser.add_argument("--unique", action="store_true", help="Make every statement unique so no cache level can answer it")
+    parser.add_argument("--variety", action="store_true", help="Bypass the response caches and request coalescing")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = asyncio.run(run_load(args.url, args.requests, args.concurrency, args.username, args.unique, args.variety, args.seed))
+    for key, value in summarize(results, time.perf_counter() - start).items():
+        print(f"{key:>15}: {value:.3f}" if isinstance(value, float) else f"{key:>15}: {value}")
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+import json5
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from services.json_repair import parse_llm_json
+
+SEED_RESPONSE = {
+    "Parameters": [{"n": 3, "p": 0.5}],
+    "gates": [
+        {"gate": "H", "qubit": 0}, {"gate": "RX", "qubit": 0, "angle": "acos(sqrt(p))"},
+        {"gate": "CCX", "control_qubit": [0, 1], "target_qubit": 2}, {"gate": "Measure", "qubit": 0}
+    ],
+    "code": ["from qiskit import QuantumCircuit\n", "qc = QuantumCircuit(3)\n", "qc.h(0)\n"],
+    "explanation": "Hadamard and RX gates produce a biased random bit; CCX entangles the qubits."
+}
+
+def legacy_extract(content_str: str) -> dict:
+    """The previous services.util.extract_json_from_content, kept for comparison."""
+    start = content_str.find('{')
+    end = content_str.rfind('}')
+    if start == -1 or end == -1:
+        raise ValueError("No JSON structure found")
+    json_str = content_str[start:end + 1]
+    json_str = re.sub(r'\\n', '', json_str)
+    json_str = re.sub(r'\\\"', '"', json_str)
+    parsed_json = json5.loads(json_str)
+    if not isinstance(parsed_json, dict):
+        raise ValueError("Invalid JSON structure")
+    return parsed_json
+
+def synthetic_corpus(size: int, seed: int = 11) -> List[str]:
+    """Realistic LLM defects applied to a well-formed response."""
+    rng = random.Random(seed)
+    clean = json.dumps(SEED_RESPONSE, indent=2)
+    defects: List[Callable[[str], str]] = [
+        lambda text: text,
+        lambda text: f"Here is the circuit:\n```json\n{text}\n```",
+        lambda text: f"{text}\nNote: replace {{p}} with your probability.",
+        lambda text: text.replace("}\n  ]", "},\n  ]").replace('"qubit": 0\n', '"qubit": 0,\n'),
+        lambda text: re.sub(r'"(\w+)":', r'\1:', text),
+        lambda text: text[:int(len(text) * rng.uniform(0.6, 0.95))],
+        lambda text: f'{{"status": "ok"}}\n{text}',
+    ]
+    return [rng.choice(defects)(clean) for _ in range(size)]
+
+def load_corpus(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as handle:
+        return [json.loads(line)["content"] for line in handle if line.strip()]
+
+def run_benchmark(corpus: List[str], repeats: int = 5) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, extractor in (("legacy", legacy_extract), ("repair", parse_llm_json)):
+        successes, timings = 0, []
+        for content in corpus:
+            try:
+                parsed = extractor(content)
+                successes += int(isinstance(parsed.get("gates"), list) and len(parsed["gates"]) > 0)
+            except Exception:
+                pass
+            start = time.perf_counter()
+            for _ in range(repeats):
+                try:
+                    extractor(content)
+                except Exception:
+                    pass
+            timings.append((time.perf_counter() - start) / repeats)
+        results[name] = {
+            "success_rate": successes / max(1, len(corpus)),
+            "median_us": statistics.median(timings) * 1e6,
+            "p95_us": sorted(timings)[int(0.95 * (len(timings) - 1))] * 1e6
+        }
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare LLM JSON extractors on captured or synthetic responses.")
+    parser.add_argument("--corpus", default=os.environ.get("DEQCODE_LLM_CAPTURE_PATH"),
+                        help="JSONL of captured completions ({\"content\": ...} per line)")
+    parser.add_argument("--synthetic", type=int, default=500, help="Synthetic responses to use when no corpus exists")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus and os.path.exists(args.corpus) else synthetic_corpus(args.synthetic)
+    print(f"{len(corpus)} responses")
+    for name, row in run_benchmark(corpus, args.repeats).items():
+        print(f"{name:>8} | success {row['success_rate']:.1%} | median {row['median_us']:.1f}us | p95 {row['p95_us']:.1f}us")
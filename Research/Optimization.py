@@ -1,30 +1,94 @@
 from abc import ABC, abstractmethod
-from qiskit import QuantumCircuit
-from qiskit.qasm2 import loads as qiskit_qasm_loads
-from qiskit.transpiler import PassManager
-from qiskit.transpiler.passes import CommutativeCancellation, CXDirection, Optimize1qGatesDecomposition
+from collections import OrderedDict
+from multiprocessing import Pool, TimeoutError as PoolTimeoutError
+from qiskit import ClassicalRegister, QuantumCircuit, qpy
+from qiskit.circuit.library import (
+    CCXGate, CCZGate, CPhaseGate, CSwapGate, CXGate, CZGate, HGate, IGate, PhaseGate, RXGate, RXXGate, RYGate,
+    RYYGate, RZGate, RZZGate, SdgGate, SGate, SwapGate, SXdgGate, SXGate, TdgGate, TGate, UnitaryGate, XGate, YGate, ZGate, iSwapGate
+)
+from qiskit.qasm2 import LEGACY_CUSTOM_INSTRUCTIONS, dumps as qiskit_qasm_dumps, loads as qiskit_qasm_loads
+from qiskit.quantum_info import Statevector
+from qiskit.synthesis import synth_permutation_basic
+from qiskit.transpiler import CouplingMap, PassManager
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+from qiskit.transpiler.passes import CommutativeCancellation, Optimize1qGatesDecomposition
 import pyzx as zx
 import cirq
-from typing import Union, Optional
+import numpy as np
+from typing import Union, Optional, Dict, List, Sequence, Tuple
+import json
 import logging
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from services.circuit_summary import CircuitSummary
+from services.gate_registry import GATE_REGISTRY
 
 #https://grok.com/share/bGVnYWN5_be6274e6-3d9b-4cb5-89e8-8c0d0349287d
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Registry gates first, then Qiskit gates only the converters need
+QISKIT_TO_CIRQ_GATES = {
+    spec.qiskit_name: spec.cirq for spec in GATE_REGISTRY.values()
+    if spec.qiskit_name and spec.cirq is not None and not spec.param_count
+}
+QISKIT_TO_CIRQ_GATES.update({
+    "ch": cirq.ControlledGate(cirq.H), "iswap": cirq.ISWAP, "ccz": cirq.CCZ, "cswap": cirq.CSWAP
+})
+
+QISKIT_TO_CIRQ_PARAMETRIC_GATES = {
+    spec.qiskit_name: spec.cirq for spec in GATE_REGISTRY.values()
+    if spec.qiskit_name and spec.cirq is not None and spec.param_count
+}
+QISKIT_TO_CIRQ_PARAMETRIC_GATES.update({
+    "p": lambda lam: cirq.ZPowGate(exponent=lam / np.pi),
+    "u1": lambda lam: cirq.ZPowGate(exponent=lam / np.pi),
+    "cp": lambda lam: cirq.CZPowGate(exponent=lam / np.pi),
+    "crx": lambda theta: cirq.ControlledGate(cirq.rx(theta)),
+    "cry": lambda theta: cirq.ControlledGate(cirq.ry(theta)),
+    "crz": lambda theta: cirq.ControlledGate(cirq.rz(theta)),
+    "rxx": lambda theta: cirq.XXPowGate(exponent=theta / np.pi, global_shift=-0.5),
+    "ryy": lambda theta: cirq.YYPowGate(exponent=theta / np.pi, global_shift=-0.5),
+    "rzz": lambda theta: cirq.ZZPowGate(exponent=theta / np.pi, global_shift=-0.5)
+})
+
+# Cirq EigenGate type -> (Qiskit gates for named exponents, Qiskit rotation built from exponent * pi)
+CIRQ_TO_QISKIT_GATES = {
+    cirq.HPowGate: ({1: HGate()}, None),
+    cirq.XPowGate: ({1: XGate(), 0.5: SXGate(), -0.5: SXdgGate()}, RXGate),
+    cirq.YPowGate: ({1: YGate()}, RYGate),
+    cirq.ZPowGate: ({1: ZGate(), 0.5: SGate(), -0.5: SdgGate(), 0.25: TGate(), -0.25: TdgGate()}, PhaseGate),
+    cirq.CXPowGate: ({1: CXGate()}, None),
+    cirq.CZPowGate: ({1: CZGate()}, CPhaseGate),
+    cirq.SwapPowGate: ({1: SwapGate()}, None),
+    cirq.ISwapPowGate: ({1: iSwapGate()}, None),
+    cirq.CCXPowGate: ({1: CCXGate()}, None),
+    cirq.CCZPowGate: ({1: CCZGate()}, None),
+    cirq.XXPowGate: ({}, RXXGate),
+    cirq.YYPowGate: ({}, RYYGate),
+    cirq.ZZPowGate: ({}, RZZGate)
+}
+
 class CircuitConverter:
-    """Handles conversion between different quantum circuit formats."""
-    
+    """Handles conversion between different quantum circuit formats.
+
+    Cirq and Qiskit circuits are converted object-to-object through the gate tables above.
+    Gates without a table entry fall back to their unitary matrix, so nothing is dropped the
+    way it is when round-tripping through OpenQASM 2.
+    """
+
     @staticmethod
     def to_qiskit(circuit: Union[QuantumCircuit, cirq.Circuit, str]) -> QuantumCircuit:
         """Convert input circuit to Qiskit QuantumCircuit."""
         if isinstance(circuit, QuantumCircuit):
             return circuit
         elif isinstance(circuit, cirq.Circuit):
-            # Convert Cirq circuit to OpenQASM, then to Qiskit
-            qasm_str = cirq.qasm(circuit)
-            return qiskit_qasm_loads(qasm_str)
+            return CircuitConverter.cirq_to_qiskit(circuit)
         elif isinstance(circuit, str):
             # Assume string is OpenQASM
             try:
@@ -40,16 +104,177 @@ class CircuitConverter:
         if target_format.lower() == "qiskit":
             return circuit
         elif target_format.lower() == "cirq":
-            qasm_str = circuit.qasm()
-            return cirq.read_qasm(qasm_str)
+            return CircuitConverter.qiskit_to_cirq(circuit)
         elif target_format.lower() == "openqasm":
-            return circuit.qasm()
+            return qiskit_qasm_dumps(circuit)
         else:
             raise ValueError(f"Unsupported target format: {target_format}")
 
+    @staticmethod
+    def qiskit_to_cirq(circuit: QuantumCircuit) -> cirq.Circuit:
+        """Convert a Qiskit circuit to Cirq without going through OpenQASM."""
+        qubits = cirq.LineQubit.range(circuit.num_qubits)
+        operations = []
+        for instr in circuit.data:
+            operation = instr.operation
+            name = operation.name
+            targets = [qubits[circuit.find_bit(q).index] for q in instr.qubits]
+            if name == "barrier":
+                continue
+            if name == "measure":
+                clbit = circuit.find_bit(instr.clbits[0])
+                register, index = clbit.registers[0] if clbit.registers else (None, clbit.index)
+                key = f"{register.name}_{index}" if register is not None else f"c_{index}"
+                operations.append(cirq.measure(*targets, key=key))
+            elif name == "reset":
+                operations.append(cirq.ResetChannel().on(*targets))
+            elif name in QISKIT_TO_CIRQ_GATES:
+                operations.append(QISKIT_TO_CIRQ_GATES[name].on(*targets))
+            elif name in QISKIT_TO_CIRQ_PARAMETRIC_GATES:
+                operations.append(QISKIT_TO_CIRQ_PARAMETRIC_GATES[name](*(float(p) for p in operation.params)).on(*targets))
+            elif operation.num_clbits == 0 and hasattr(operation, "to_matrix"):
+                # Qiskit matrices are little-endian, Cirq's are big-endian
+                operations.append(cirq.MatrixGate(operation.to_matrix(), name=name).on(*reversed(targets)))
+            else:
+                raise ValueError(f"Cannot convert Qiskit operation '{name}' to Cirq")
+        if circuit.global_phase:
+            operations.append(cirq.global_phase_operation(np.exp(1j * float(circuit.global_phase))))
+        return cirq.Circuit(operations)
+
+    @staticmethod
+    def cirq_to_qiskit(circuit: cirq.Circuit) -> QuantumCircuit:
+        """Convert a Cirq circuit to Qiskit without going through OpenQASM."""
+        qubit_index = {q: i for i, q in enumerate(sorted(circuit.all_qubits()))}
+        qc = QuantumCircuit(len(qubit_index))
+        registers = {}
+        global_phase = 0.0
+        for op in circuit.all_operations():
+            gate = op.gate
+            targets = [qubit_index[q] for q in op.qubits]
+            if isinstance(gate, cirq.MeasurementGate):
+                register = registers.get(gate.key)
+                if register is None:
+                    register = ClassicalRegister(len(targets), "m_" + re.sub(r"\W", "_", gate.key))
+                    registers[gate.key] = register
+                    qc.add_register(register)
+                for target, clbit in zip(targets, register):
+                    qc.measure(target, clbit)
+                continue
+            if isinstance(gate, cirq.ResetChannel):
+                qc.reset(targets[0])
+                continue
+            if isinstance(gate, cirq.GlobalPhaseGate):
+                global_phase += float(np.angle(gate.coefficient))
+                continue
+            if isinstance(gate, cirq.CSwapGate):
+                qc.append(CSwapGate(), targets, copy=False)
+                continue
+            if isinstance(gate, cirq.IdentityGate):
+                for target in targets:
+                    qc.append(IGate(), [target], copy=False)
+                continue
+            mapping = CIRQ_TO_QISKIT_GATES.get(type(gate)) if isinstance(gate, cirq.EigenGate) else None
+            if mapping is not None and not cirq.is_parameterized(gate):
+                named_gates, rotation = mapping
+                exponent = float(gate.exponent)
+                if gate.global_shift == 0 and exponent in named_gates:
+                    qc.append(named_gates[exponent], targets, copy=False)
+                    continue
+                if isinstance(gate, cirq.ZPowGate) and gate.global_shift == -0.5:
+                    rotation = RZGate
+                if rotation is not None:
+                    # cirq: G**t with shift s == exp(i*pi*t*(s - s_rot)) * rotation(pi*t)
+                    rotation_shift = 0.0 if rotation in (PhaseGate, CPhaseGate) else -0.5
+                    qc.append(rotation(np.pi * exponent), targets, copy=False)
+                    global_phase += np.pi * exponent * (gate.global_shift - rotation_shift)
+                    continue
+            if cirq.has_unitary(op):
+                qc.append(UnitaryGate(cirq.unitary(op)), list(reversed(targets)), copy=False)
+                continue
+            raise ValueError(f"Cannot convert Cirq operation '{op}' to Qiskit")
+        qc.global_phase = global_phase
+        return qc
+
+    @staticmethod
+    def to_qiskit_via_qasm(circuit: cirq.Circuit) -> QuantumCircuit:
+        """Legacy OpenQASM 2 round-trip, kept for benchmarking the direct converter."""
+        # Cirq writes gates such as swap that Qiskit's strict qelib1.inc does not define
+        return qiskit_qasm_loads(cirq.qasm(circuit), custom_instructions=LEGACY_CUSTOM_INSTRUCTIONS)
+
+    @staticmethod
+    def to_cirq_via_qasm(circuit: QuantumCircuit) -> cirq.Circuit:
+        """Legacy OpenQASM 2 round-trip, kept for benchmarking the direct converter."""
+        from cirq.contrib.qasm_import import circuit_from_qasm
+        return circuit_from_qasm(qiskit_qasm_dumps(circuit))
+
+class OptimizationCache:
+    """Two-tier cache of optimized circuits: an in-memory LRU backed by QPY files on disk.
+
+    Entries are keyed by (input fingerprint, optimizer kind, pass-config version), so bumping
+    an optimizer's ``PASS_CONFIG_VERSION`` invalidates everything it produced before.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None):
+        self._max_entries = max_entries
+        self._memory: "OrderedDict[str, QuantumCircuit]" = OrderedDict()
+        self._cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        if self._cache_dir:
+            os.makedirs(self._cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint: str, optimizer_kind: str, config_version: str) -> str:
+        return f"{fingerprint}-{optimizer_kind}-v{config_version}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.qpy")
+
+    def _remember(self, key: str, circuit: QuantumCircuit) -> None:
+        self._memory[key] = circuit
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[QuantumCircuit]:
+        """Return a copy of the cached circuit, promoting disk hits into memory."""
+        circuit = self._memory.get(key)
+        if circuit is not None:
+            self._memory.move_to_end(key)
+        elif self._cache_dir and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), "rb") as f:
+                    circuit = qpy.load(f)[0]
+                self._remember(key, circuit)
+            except Exception as e:
+                logging.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+                circuit = None
+        if circuit is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return circuit.copy()
+
+    def put(self, key: str, circuit: QuantumCircuit) -> None:
+        self._remember(key, circuit.copy())
+        if self._cache_dir:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    qpy.dump(circuit, f)
+                os.replace(tmp_path, self._path(key))
+            except Exception as e:
+                logging.warning(f"Could not persist cache entry {key}: {str(e)}")
+
+    def clear(self) -> None:
+        self._memory.clear()
+
 class QuantumCircuitOptimizerBase(ABC):
     """Abstract base class for quantum circuit optimizers."""
-    
+
+    KIND = "base"
+    PASS_CONFIG_VERSION = "1"
+
     @abstractmethod
     def optimize(self, circuit: QuantumCircuit) -> QuantumCircuit:
         """Optimize a Qiskit QuantumCircuit."""
@@ -65,11 +290,13 @@ class QuantumCircuitOptimizerBase(ABC):
 
 class SmallCircuitOptimizer(QuantumCircuitOptimizerBase):
     """Optimizer for small circuits (<= 50 gates) using Qiskit passes."""
-    
+
+    KIND = "small"
+    PASS_CONFIG_VERSION = "1"
+
     def __init__(self):
         self._pass_manager = PassManager([
             CommutativeCancellation(),
-            CXDirection(),
             Optimize1qGatesDecomposition()
         ])
         logging.info("Initialized SmallCircuitOptimizer with Qiskit passes.")
@@ -85,41 +312,449 @@ class SmallCircuitOptimizer(QuantumCircuitOptimizerBase):
             raise RuntimeError(f"Small circuit optimization failed: {str(e)}")
 
 class LargeCircuitOptimizer(QuantumCircuitOptimizerBase):
-    """Optimizer for large circuits (> 50 gates) using ZX-calculus."""
-    
-    def __init__(self):
+    """Optimizer for large circuits (> 50 gates) using ZX-calculus.
+
+    With a ``time_budget`` (seconds) the optimizer runs in anytime mode: the ``full_reduce``
+    schedule is applied one round at a time, the best extractable circuit is checkpointed after
+    every round and returned once the budget expires. A round that has started is always
+    finished, so the budget can be overshot by at most one simplification round plus extraction.
+    Progress of the last run is kept in ``progress``.
+    """
+
+    KIND = "large"
+    PASS_CONFIG_VERSION = "1"
+
+    def __init__(self, time_budget: Optional[float] = None):
+        self._time_budget = time_budget
+        if time_budget is not None:
+            self.KIND = f"large-anytime{time_budget:g}s"
+        self.progress: dict = {}
         logging.info("Initialized LargeCircuitOptimizer with PyZX.")
 
+    # Gates PyZX's QASM parser reads; anything else is translated to them first
+    ZX_BASIS = ["h", "x", "z", "s", "sdg", "t", "tdg", "rx", "rz", "cx", "cz", "ccx"]
+
+    @classmethod
+    def _to_zx_graph(cls, circuit: QuantumCircuit):
+        """PyZX has no Qiskit bridge, so circuits cross over as OpenQASM 2."""
+        basic_circuit = generate_preset_pass_manager(optimization_level=0, basis_gates=cls.ZX_BASIS).run(circuit)
+        return zx.Circuit.from_qasm(qiskit_qasm_dumps(basic_circuit)).to_graph()
+
+    @staticmethod
+    def _extract(zx_graph) -> QuantumCircuit:
+        extracted = zx.extract_circuit(zx_graph.copy())
+        return qiskit_qasm_loads(extracted.to_basic_gates().to_qasm())
+
     def optimize(self, circuit: QuantumCircuit) -> QuantumCircuit:
         """Optimize large circuits using PyZX ZX-calculus."""
         self._validate_circuit(circuit)
+        if self._time_budget is not None:
+            return self._optimize_anytime(circuit)
         try:
-            zx_circuit = zx.Circuit.from_qiskit(circuit)
-            zx_graph = zx_circuit.to_graph()
+            zx_graph = self._to_zx_graph(circuit)
             zx.simplify.full_reduce(zx_graph)
-            optimized_circuit = zx.extract_circuit(zx_graph).to_qiskit()
+            optimized_circuit = self._extract(zx_graph)
             logging.info(f"Optimized large circuit: {circuit.size()} -> {optimized_circuit.size()} gates.")
             return optimized_circuit
         except Exception as e:
             raise RuntimeError(f"Large circuit optimization failed: {str(e)}")
 
+    @staticmethod
+    def _simplification_rounds():
+        """Yield the steps of ``zx.simplify.full_reduce`` one round at a time.
+
+        Each round reports whether it rewrote anything, so the caller can stop at the fixpoint.
+        The steps mirror ``full_reduce`` in pyzx 0.10, whose simp functions take only the graph.
+        """
+        def first_round(g) -> bool:
+            interior = zx.simplify.interior_clifford_simp(g)
+            return bool(zx.simplify.pivot_gadget_simp(g)) or bool(interior)
+
+        def fixpoint_round(g) -> bool:
+            zx.simplify.clifford_simp(g)
+            gadgets = zx.simplify.gadget_simp(g)
+            zx.simplify.interior_clifford_simp(g)
+            copies = zx.simplify.copy_simp(g)
+            supplementarities = zx.simplify.supplementarity_simp(g)
+            pivots = zx.simplify.pivot_gadget_simp(g)
+            rewrote = bool(gadgets or pivots or copies or supplementarities)
+            if not rewrote:
+                g.remove_isolated_vertices()
+            return rewrote
+
+        yield first_round
+        while True:
+            yield fixpoint_round
+
+    def _optimize_anytime(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        start = time.monotonic()
+        deadline = start + self._time_budget
+        best_circuit, best_size = circuit, circuit.size()
+        checkpoints = []
+        rounds = 0
+        converged = False
+        try:
+            zx_graph = self._to_zx_graph(circuit)
+            for simplification_round in self._simplification_rounds():
+                if time.monotonic() >= deadline:
+                    break
+                rewrites = simplification_round(zx_graph)
+                rounds += 1
+                if time.monotonic() >= deadline and checkpoints:
+                    break
+                extracted = self._extract(zx_graph)
+                checkpoints.append({"round": rounds, "gates": extracted.size(),
+                                    "elapsed": round(time.monotonic() - start, 4)})
+                if extracted.size() < best_size:
+                    best_circuit, best_size = extracted, extracted.size()
+                if rounds > 1 and not rewrites:
+                    converged = True
+                    break
+        except Exception as e:
+            if not checkpoints:
+                raise RuntimeError(f"Large circuit optimization failed: {str(e)}")
+            logging.warning(f"Anytime ZX optimization stopped after round {rounds}: {str(e)}")
+        self.progress = {
+            "time_budget": self._time_budget,
+            "elapsed": round(time.monotonic() - start, 4),
+            "rounds_completed": rounds,
+            "converged": converged,
+            "budget_exhausted": not converged and time.monotonic() >= deadline,
+            "best_gates": best_size,
+            "checkpoints": checkpoints
+        }
+        logging.info(f"Anytime ZX optimization: {circuit.size()} -> {best_size} gates after {rounds} rounds.")
+        return best_circuit
+
+def _restore_qubit_order(circuit: QuantumCircuit) -> QuantumCircuit:
+    """Undo the output permutation a preset pipeline left in ``layout.final_layout``.
+
+    Levels 2 and 3 elide SWAPs and only record the resulting permutation, so their output is
+    not equivalent on its own; the permutation is appended back as explicit SWAPs so the
+    contender is scored and returned as the circuit it really is.
+    """
+    if circuit.layout is None or circuit.layout.final_layout is None:
+        return circuit
+    restored = QuantumCircuit(*circuit.qregs, *circuit.cregs, global_phase=circuit.global_phase)
+    restored.compose(circuit, inplace=True)
+    restored.compose(synth_permutation_basic(circuit.layout.routing_permutation()), inplace=True)
+    return restored
+
+def _run_portfolio_contender(contender: str, circuit: QuantumCircuit,
+                             time_budget: Optional[float] = None) -> Tuple[QuantumCircuit, float]:
+    """Run one portfolio contender inside a worker process and time it."""
+    start = time.perf_counter()
+    if contender == "pyzx":
+        optimized_circuit = LargeCircuitOptimizer(time_budget=time_budget).optimize(circuit)
+    elif contender == "passes":
+        optimized_circuit = SmallCircuitOptimizer().optimize(circuit)
+    else:
+        level = int(contender.split("-level")[1])
+        optimized_circuit = _restore_qubit_order(generate_preset_pass_manager(optimization_level=level).run(circuit))
+    return optimized_circuit, time.perf_counter() - start
+
+class PortfolioOptimizer(QuantumCircuitOptimizerBase):
+    """Runs several optimizers concurrently in a process pool and keeps the cheapest result.
+
+    Contenders are the Qiskit preset pipelines at ``levels``, the hand-picked Qiskit passes and
+    PyZX ``full_reduce``. ``cost`` is a metric name (``gate_count``, ``two_qubit_count``,
+    ``depth``) or a mapping of metric names to weights. Contenders that fail or exceed their
+    timeout are reported but never selected.
+    """
+
+    COST_METRICS = {
+        "gate_count": lambda summary: summary.total_gates,
+        "two_qubit_count": lambda summary: summary.two_qubit_count,
+        "depth": lambda summary: summary.depth
+    }
+    PASS_CONFIG_VERSION = "1"
+
+    def __init__(self, levels: Sequence[int] = (1, 2, 3), include_pyzx: bool = True,
+                 cost: Union[str, Dict[str, float]] = "gate_count", timeout: float = 30.0,
+                 timeouts: Optional[Dict[str, float]] = None, max_workers: Optional[int] = None):
+        self._weights = {cost: 1.0} if isinstance(cost, str) else dict(cost)
+        unknown = set(self._weights) - set(self.COST_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown cost metrics: {unknown}. Supported: {set(self.COST_METRICS)}")
+        self._contenders = [f"qiskit-level{level}" for level in levels] + ["passes"]
+        if include_pyzx:
+            self._contenders.append("pyzx")
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+        self._max_workers = max_workers or min(len(self._contenders), os.cpu_count() or 1)
+        cost_key = "+".join(f"{name}*{weight:g}" for name, weight in sorted(self._weights.items()))
+        self.KIND = f"portfolio-{'-'.join(self._contenders)}-{cost_key}"
+        self.last_results: List[dict] = []
+        logging.info(f"Initialized PortfolioOptimizer with contenders: {self._contenders}.")
+
+    def score(self, circuit: QuantumCircuit) -> float:
+        summary = CircuitSummary.from_circuit(circuit)
+        return sum(weight * self.COST_METRICS[name](summary) for name, weight in self._weights.items())
+
+    def optimize(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        """Optimize with every contender and return the lowest-cost circuit."""
+        self._validate_circuit(circuit)
+        self.last_results = []
+        best_circuit, best_score = None, None
+        pool = Pool(processes=self._max_workers)
+        try:
+            submitted = time.monotonic()
+            # PyZX runs in anytime mode so it returns its best checkpoint instead of timing out
+            pending = {
+                name: pool.apply_async(_run_portfolio_contender, (
+                    name, circuit, 0.8 * self._timeouts.get(name, self._timeout) if name == "pyzx" else None
+                ))
+                for name in self._contenders
+            }
+            for name, async_result in pending.items():
+                timeout = self._timeouts.get(name, self._timeout)
+                result = {"name": name, "status": "ok", "score": None, "runtime": None}
+                try:
+                    remaining = max(0.0, submitted + timeout - time.monotonic())
+                    optimized_circuit, runtime = async_result.get(timeout=remaining)
+                    result["runtime"] = round(runtime, 4)
+                    if optimized_circuit.num_qubits != circuit.num_qubits:
+                        raise ValueError("qubit count changed")
+                    result["score"] = self.score(optimized_circuit)
+                    if best_score is None or result["score"] < best_score:
+                        best_circuit, best_score = optimized_circuit, result["score"]
+                except PoolTimeoutError:
+                    result["status"] = "timeout"
+                    result["runtime"] = timeout
+                except Exception as e:
+                    result["status"] = f"error: {str(e)}"
+                self.last_results.append(result)
+        finally:
+            pool.terminate()
+            pool.join()
+        if best_circuit is None:
+            raise RuntimeError(f"Portfolio optimization failed for every contender: {self.last_results}")
+        logging.info(f"Portfolio selected circuit with score {best_score}: {self.last_results}")
+        return best_circuit
+
+def _run_routing_trial(circuit: QuantumCircuit, coupling_edges: List[List[int]], optimization_level: int,
+                       seed: int) -> Tuple[QuantumCircuit, int, float]:
+    """Lay out and route the circuit for one seed inside a worker process."""
+    start = time.perf_counter()
+    pass_manager = generate_preset_pass_manager(
+        optimization_level=optimization_level, coupling_map=CouplingMap(coupling_edges), seed_transpiler=seed
+    )
+    routed_circuit = pass_manager.run(circuit)
+    return routed_circuit, routed_circuit.count_ops().get("swap", 0), time.perf_counter() - start
+
+class HardwareRouter:
+    """Maps an optimized circuit onto a device's connectivity, keeping the lowest-SWAP routing.
+
+    The device is given as a coupling map (edge list or ``CouplingMap``) or as a backend, either a
+    ``BackendV2`` instance such as ``GenericBackendV2`` or the name of an offline fake backend from
+    ``qiskit_ibm_runtime.fake_provider`` (e.g. ``"FakeManilaV2"``). Layout and routing run once per
+    seed in a process pool; SWAPs are kept as gates during the trials so they can be counted, and
+    the winning circuit is translated to the backend's basis gates when a backend is known.
+    """
+
+    def __init__(self, coupling_map: Union[CouplingMap, List[List[int]], None] = None, backend=None,
+                 trials: int = 8, seed: int = 0, optimization_level: int = 1, max_workers: Optional[int] = None):
+        if isinstance(backend, str):
+            backend = self._load_fake_backend(backend)
+        self._basis_gates: Optional[List[str]] = None
+        if backend is not None:
+            coupling_map = backend.coupling_map
+            self._basis_gates = [name for name in backend.operation_names if name not in ("measure", "reset", "delay")]
+        if coupling_map is None:
+            raise ValueError("HardwareRouter needs a coupling map or a backend.")
+        self._coupling_map = coupling_map if isinstance(coupling_map, CouplingMap) else CouplingMap(coupling_map)
+        self._seeds = [seed + trial for trial in range(trials)]
+        self._optimization_level = optimization_level
+        self._max_workers = max_workers or min(trials, os.cpu_count() or 1)
+        self.last_results: List[dict] = []
+        logging.info(f"Initialized HardwareRouter for {self._coupling_map.size()} physical qubits with {trials} trials.")
+
+    @staticmethod
+    def _load_fake_backend(name: str):
+        try:
+            from qiskit_ibm_runtime import fake_provider
+        except ImportError:
+            raise ValueError(f"Fake backend '{name}' requires the qiskit-ibm-runtime package.")
+        if not hasattr(fake_provider, name):
+            raise ValueError(f"Unknown fake backend: {name}")
+        return getattr(fake_provider, name)()
+
+    def route(self, circuit: QuantumCircuit) -> QuantumCircuit:
+        if circuit.num_qubits > self._coupling_map.size():
+            raise ValueError(f"Circuit needs {circuit.num_qubits} qubits but the device has {self._coupling_map.size()}.")
+        edges = [list(edge) for edge in self._coupling_map.get_edges()]
+        with Pool(processes=self._max_workers) as pool:
+            trials = pool.starmap(
+                _run_routing_trial, [(circuit, edges, self._optimization_level, seed) for seed in self._seeds]
+            )
+        self.last_results = []
+        best_index = None
+        # Only SWAPs the router inserted count against a trial, not the ones the circuit already had
+        input_swaps = circuit.count_ops().get("swap", 0)
+        for index, (routed_circuit, routed_swaps, runtime) in enumerate(trials):
+            summary = CircuitSummary.from_circuit(routed_circuit)
+            swaps = max(0, routed_swaps - input_swaps)
+            self.last_results.append({
+                "seed": self._seeds[index],
+                "swaps": swaps,
+                # each SWAP in the routed circuit costs three CX on hardware
+                "two_qubit_count": summary.two_qubit_count + 2 * routed_swaps,
+                "depth": summary.depth,
+                "runtime": round(runtime, 4)
+            })
+            rank = (swaps, self.last_results[-1]["two_qubit_count"], summary.depth)
+            if best_index is None or rank < best_rank:
+                best_index, best_rank = index, rank
+        best_circuit = trials[best_index][0]
+        if self._basis_gates:
+            best_circuit = generate_preset_pass_manager(optimization_level=0, basis_gates=self._basis_gates).run(best_circuit)
+        logging.info(f"Routing kept seed {self._seeds[best_index]}: {self.last_results[best_index]}")
+        return best_circuit
+
+class EquivalenceVerifier:
+    """Probabilistic equivalence check between an original and an optimized circuit.
+
+    Both circuits are applied to a few random product input states and the resulting
+    statevectors are compared up to global phase, stopping at the first mismatch. The cost is
+    ``trials`` statevector simulations instead of building a full unitary. Verdicts are cached by
+    the pair of circuit fingerprints, so re-optimizing a known circuit is free.
+    """
+
+    def __init__(self, trials: int = 4, tolerance: float = 1e-6, max_qubits: int = 20,
+                 seed: Optional[int] = None, cache_size: int = 1024):
+        self._trials = trials
+        self._tolerance = tolerance
+        self._max_qubits = max_qubits
+        self._rng = np.random.default_rng(seed)
+        self._cache_size = cache_size
+        self._verified: "OrderedDict[Tuple[str, str], bool]" = OrderedDict()
+
+    def _random_product_state(self, num_qubits: int) -> np.ndarray:
+        state = np.ones(1, dtype=complex)
+        for _ in range(num_qubits):
+            amplitudes = self._rng.normal(size=2) + 1j * self._rng.normal(size=2)
+            # Qiskit orders qubits little-endian, so later qubits are the more significant factor
+            state = np.kron(amplitudes / np.linalg.norm(amplitudes), state)
+        return state
+
+    def verify(self, original: QuantumCircuit, optimized: QuantumCircuit) -> dict:
+        """Return ``equivalent`` as True/False, or None when the circuits cannot be simulated."""
+        if original.num_qubits != optimized.num_qubits:
+            return {"equivalent": False, "trials": 0, "cached": False, "reason": "qubit count differs"}
+        if original.num_qubits > self._max_qubits:
+            return {"equivalent": None, "trials": 0, "cached": False, "reason": f"more than {self._max_qubits} qubits"}
+        key = (CircuitSummary.from_circuit(original).fingerprint, CircuitSummary.from_circuit(optimized).fingerprint)
+        if key in self._verified:
+            self._verified.move_to_end(key)
+            return {"equivalent": self._verified[key], "trials": 0, "cached": True, "reason": None}
+        try:
+            original_unitary = original.remove_final_measurements(inplace=False)
+            optimized_unitary = optimized.remove_final_measurements(inplace=False)
+            trials = 0
+            equivalent = True
+            for _ in range(self._trials):
+                trials += 1
+                input_state = Statevector(self._random_product_state(original.num_qubits))
+                expected = input_state.evolve(original_unitary).data
+                actual = input_state.evolve(optimized_unitary).data
+                if abs(abs(np.vdot(expected, actual)) - 1.0) > self._tolerance:
+                    equivalent = False
+                    break
+        except Exception as e:
+            return {"equivalent": None, "trials": 0, "cached": False, "reason": f"not simulable: {str(e)}"}
+        self._verified[key] = equivalent
+        while len(self._verified) > self._cache_size:
+            self._verified.popitem(last=False)
+        return {"equivalent": equivalent, "trials": trials, "cached": False, "reason": None}
+
+DEFAULT_THRESHOLD_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "optimizer_threshold.json")
+
+class ThresholdRule:
+    """Decides between the small (Qiskit passes) and large (PyZX) optimizer.
+
+    A rule is a conjunction of ``feature > value`` conditions over ``size``, ``depth`` and
+    ``t_count``; the large optimizer is used when every condition holds. Tuned rules are written
+    by ``ThresholdTuning.py`` and loaded once per process from ``OPTIMIZER_THRESHOLD_CONFIG``
+    (default ``optimizer_threshold.json`` next to this module).
+    """
+
+    FEATURES = ("size", "depth", "t_count")
+    _loaded: Dict[str, "ThresholdRule"] = {}
+
+    def __init__(self, conditions: List[Dict[str, float]], source: str = "default"):
+        for condition in conditions:
+            if condition["feature"] not in self.FEATURES:
+                raise ValueError(f"Unknown rule feature: {condition['feature']}")
+        self.conditions = conditions
+        self.source = source
+
+    @classmethod
+    def from_size_threshold(cls, size_threshold: int) -> "ThresholdRule":
+        return cls([{"feature": "size", "value": size_threshold}], source=f"size_threshold={size_threshold}")
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, default_size_threshold: int = 50) -> "ThresholdRule":
+        path = path or os.environ.get("OPTIMIZER_THRESHOLD_CONFIG", DEFAULT_THRESHOLD_CONFIG)
+        if path not in cls._loaded:
+            try:
+                with open(path, "r") as f:
+                    config = json.load(f)
+                cls._loaded[path] = cls(config["rule"], source=path)
+                logging.info(f"Loaded optimizer threshold rule from {path}: {config['rule']}")
+            except FileNotFoundError:
+                cls._loaded[path] = cls.from_size_threshold(default_size_threshold)
+            except Exception as e:
+                logging.warning(f"Ignoring invalid threshold config {path}: {str(e)}")
+                cls._loaded[path] = cls.from_size_threshold(default_size_threshold)
+        return cls._loaded[path]
+
+    @staticmethod
+    def features(circuit: QuantumCircuit) -> Dict[str, int]:
+        summary = CircuitSummary.from_circuit(circuit)
+        return {
+            "size": circuit.size(),
+            "depth": summary.depth,
+            "t_count": summary.gate_counts.get("t", 0) + summary.gate_counts.get("tdg", 0)
+        }
+
+    def use_large(self, features: Dict[str, int]) -> bool:
+        return all(features[condition["feature"]] > condition["value"] for condition in self.conditions)
+
+    def save(self, path: str, metadata: Optional[dict] = None) -> None:
+        with open(path, "w") as f:
+            json.dump({"rule": self.conditions, **(metadata or {})}, f, indent=2)
+
 class QuantumCircuitOptimizer:
     """Main optimizer class supporting multiple frameworks."""
     
     SUPPORTED_FORMATS = {"qiskit", "cirq", "openqasm"}
     
-    def __init__(self, size_threshold: int = 50):
-        self._size_threshold = size_threshold
+    def __init__(self, size_threshold: Optional[int] = None, cache: Optional[OptimizationCache] = None,
+                 portfolio: Optional[PortfolioOptimizer] = None, zx_time_budget: Optional[float] = None,
+                 verifier: Optional[EquivalenceVerifier] = None, verify: bool = True,
+                 router: Optional[HardwareRouter] = None):
+        # An explicit size_threshold overrides the tuned rule from the config file
+        self._rule = ThresholdRule.from_size_threshold(size_threshold) if size_threshold is not None else ThresholdRule.load()
+        self._router = router
+        self._portfolio = portfolio
+        self._verifier = (verifier or EquivalenceVerifier()) if verify else None
         self._small_optimizer = SmallCircuitOptimizer()
-        self._large_optimizer = LargeCircuitOptimizer()
+        self._large_optimizer = LargeCircuitOptimizer(time_budget=zx_time_budget)
         self._converter = CircuitConverter()
+        self._cache = cache if cache is not None else OptimizationCache(
+            cache_dir=os.environ.get("OPTIMIZER_CACHE_DIR")
+        )
         self._original_circuit = None
         self._optimized_circuit: Optional[QuantumCircuit] = None
         self._input_format: Optional[str] = None
-        logging.info(f"QuantumCircuitOptimizer initialized with threshold: {size_threshold} gates.")
+        self._contenders: List[dict] = []
+        self._zx_progress: dict = {}
+        self._verification: dict = {}
+        self._routed_circuit: Optional[QuantumCircuit] = None
+        logging.info(f"QuantumCircuitOptimizer initialized with threshold rule: {self._rule.conditions} ({self._rule.source}).")
 
     def _is_large_circuit(self, circuit: QuantumCircuit) -> bool:
-        return circuit.size() > self._size_threshold
+        return self._rule.use_large(ThresholdRule.features(circuit))
 
     def optimize(self, circuit: Union[QuantumCircuit, cirq.Circuit, str], input_format: str = "qiskit") -> any:
         """Optimize a circuit from any supported framework."""
@@ -131,17 +766,46 @@ class QuantumCircuitOptimizer:
         qiskit_circuit = self._converter.to_qiskit(circuit)
         self._original_circuit = qiskit_circuit.copy()
         
-        # Choose optimizer based on size
-        optimizer = self._large_optimizer if self._is_large_circuit(qiskit_circuit) else self._small_optimizer
-        self._optimized_circuit = optimizer.optimize(qiskit_circuit)
+        # Portfolio mode races every optimizer, otherwise choose one based on size
+        if self._portfolio is not None:
+            optimizer = self._portfolio
+            self._portfolio.last_results = []
+        else:
+            optimizer = self._large_optimizer if self._is_large_circuit(qiskit_circuit) else self._small_optimizer
+        self._large_optimizer.progress = {}
+        self._optimized_circuit = self._run_cached(optimizer, qiskit_circuit)
+        self._contenders = list(self._portfolio.last_results) if self._portfolio is not None else []
+        self._zx_progress = dict(self._large_optimizer.progress) if optimizer is self._large_optimizer else {}
         
         # Validate tensor shape consistency
         if self._optimized_circuit.num_qubits != self._original_circuit.num_qubits:
             raise ValueError("Optimization altered qubit count, tensor shape mismatch detected.")
-        
+
+        # Randomized equivalence check; a circuit that provably changed behaviour is discarded
+        self._verification = self._verifier.verify(self._original_circuit, self._optimized_circuit) if self._verifier else {}
+        if self._verification.get("equivalent") is False:
+            logging.error("Optimized circuit is not equivalent to the original; returning the original circuit.")
+            self._optimized_circuit = self._original_circuit.copy()
+
+        # Target mode: map the logical circuit onto the device and return the routed version
+        if self._router is not None:
+            self._routed_circuit = self._router.route(self._optimized_circuit)
+            return self._converter.from_qiskit(self._routed_circuit, self._input_format)
+
         # Convert back to the original format
         return self._converter.from_qiskit(self._optimized_circuit, self._input_format)
 
+    def _run_cached(self, optimizer: QuantumCircuitOptimizerBase, circuit: QuantumCircuit) -> QuantumCircuit:
+        fingerprint = CircuitSummary.from_circuit(circuit).fingerprint
+        key = OptimizationCache.make_key(fingerprint, optimizer.KIND, optimizer.PASS_CONFIG_VERSION)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logging.info(f"Optimization cache hit for {key}.")
+            return cached
+        optimized_circuit = optimizer.optimize(circuit)
+        self._cache.put(key, optimized_circuit)
+        return optimized_circuit
+
     def compare_circuits(self) -> dict:
         """Compare original and optimized circuits (in Qiskit format)."""
         if not self._original_circuit or not self._optimized_circuit:
@@ -153,6 +817,22 @@ class QuantumCircuitOptimizer:
             "original_depth": self._original_circuit.depth(),
             "optimized_depth": self._optimized_circuit.depth()
         }
+        if self._portfolio is not None:
+            comparison["contenders"] = self._contenders
+        if self._zx_progress:
+            comparison["zx_progress"] = self._zx_progress
+        if self._verification:
+            comparison["verification"] = self._verification
+        if self._router is not None and self._routed_circuit is not None:
+            best = min(self._router.last_results, key=lambda trial: (trial["swaps"], trial["two_qubit_count"], trial["depth"]))
+            comparison["routing"] = {
+                "swaps": best["swaps"],
+                "two_qubit_count": best["two_qubit_count"],
+                "routed_gates": self._routed_circuit.size(),
+                "routed_depth": self._routed_circuit.depth(),
+                "seed": best["seed"],
+                "trials": self._router.last_results
+            }
         logging.info(f"Circuit comparison: {comparison}")
         return comparison
 
@@ -195,6 +875,12 @@ if __name__ == "__main__":
     print(optimized_qiskit)
     print(optimizer.compare_circuits())
 
+    # Race every optimizer and keep the circuit with the fewest two-qubit gates
+    print("\nPortfolio Optimization:")
+    portfolio_optimizer = QuantumCircuitOptimizer(portfolio=PortfolioOptimizer(cost={"two_qubit_count": 10, "depth": 1}))
+    print(portfolio_optimizer.optimize(qc, input_format="qiskit"))
+    print(portfolio_optimizer.compare_circuits())
+
     # Optimize Cirq circuit
     print("\nCirq Circuit Optimization:")
     optimized_cirq = optimizer.optimize(cirq_circuit, input_format="cirq")
@@ -0,0 +1,139 @@
+import argparse
+import itertools
+import logging
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import QFT
+from Optimization import DEFAULT_THRESHOLD_CONFIG, LargeCircuitOptimizer, SmallCircuitOptimizer, ThresholdRule
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+def random_clifford_t(scale: int, rng: random.Random) -> QuantumCircuit:
+    num_qubits = max(2, min(12, scale // 10))
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(scale):
+        choice = rng.random()
+        if choice < 0.3:
+            qc.cx(*rng.sample(range(num_qubits), 2))
+        elif choice < 0.5:
+            qc.t(rng.randrange(num_qubits))
+        else:
+            getattr(qc, rng.choice(["h", "s", "x", "z"]))(rng.randrange(num_qubits))
+    return qc
+
+def rotation_layers(scale: int, rng: random.Random) -> QuantumCircuit:
+    num_qubits = max(2, min(12, scale // 12))
+    qc = QuantumCircuit(num_qubits)
+    while qc.size() < scale:
+        for qubit in range(num_qubits):
+            qc.rz(rng.uniform(0, 2 * np.pi), qubit)
+            qc.rx(rng.uniform(0, 2 * np.pi), qubit)
+        for qubit in range(num_qubits - 1):
+            qc.cx(qubit, qubit + 1)
+    return qc
+
+def qft_family(scale: int, rng: random.Random) -> QuantumCircuit:
+    num_qubits = max(2, int(np.sqrt(2 * scale)))
+    return QFT(num_qubits).decompose()
+
+def toffoli_network(scale: int, rng: random.Random) -> QuantumCircuit:
+    num_qubits = max(3, min(12, scale // 15))
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(max(1, scale // 15)):
+        qc.ccx(*rng.sample(range(num_qubits), 3))
+    return qc.decompose()
+
+CIRCUIT_FAMILIES: Dict[str, Callable[[int, random.Random], QuantumCircuit]] = {
+    "random_clifford_t": random_clifford_t,
+    "rotation_layers": rotation_layers,
+    "qft": qft_family,
+    "toffoli_network": toffoli_network
+}
+
+def benchmark(scales: List[int], seeds: int = 3, zx_time_budget: float = 60.0) -> List[dict]:
+    """Optimize every family at every scale with both optimizers and record time and reduction."""
+    small_optimizer = SmallCircuitOptimizer()
+    large_optimizer = LargeCircuitOptimizer(time_budget=zx_time_budget)
+    samples = []
+    for family, build in CIRCUIT_FAMILIES.items():
+        for scale, seed in itertools.product(scales, range(seeds)):
+            circuit = build(scale, random.Random(seed))
+            sample = {"family": family, "scale": scale, "seed": seed, **ThresholdRule.features(circuit)}
+            for kind, optimizer in (("small", small_optimizer), ("large", large_optimizer)):
+                start = time.perf_counter()
+                try:
+                    optimized_size = optimizer.optimize(circuit).size()
+                    sample[f"{kind}_reduction"] = (circuit.size() - optimized_size) / max(1, circuit.size())
+                except Exception as e:
+                    # A failure is not a 0% reduction; the sample is kept for the log but left out of the fit
+                    logging.warning(f"{kind} optimizer failed on {family}/{scale}: {str(e)}")
+                    sample[f"{kind}_reduction"] = None
+                    sample.setdefault("failed", []).append(kind)
+                sample[f"{kind}_time"] = time.perf_counter() - start
+            samples.append(sample)
+            logging.info(f"Benchmarked {family} scale={scale} seed={seed}: {sample}")
+    return samples
+
+def label(sample: dict, time_weight: float) -> bool:
+    """True when PyZX is worth it: its extra reduction outweighs its extra time at ``time_weight`` per second."""
+    small_utility = sample["small_reduction"] - time_weight * sample["small_time"]
+    large_utility = sample["large_reduction"] - time_weight * sample["large_time"]
+    return large_utility > small_utility
+
+def fit_rule(samples: List[dict], time_weight: float = 0.05) -> Tuple[ThresholdRule, float]:
+    """Exhaustively search one- and two-condition rules and keep the most accurate (simplest on ties).
+
+    Samples where either optimizer failed carry no comparison and are skipped; if none are left
+    the fit is refused rather than learning from failures.
+    """
+    samples = [sample for sample in samples if not sample.get("failed")]
+    if not samples:
+        raise ValueError("Every benchmark sample has a failed optimizer run; nothing to fit.")
+    labels = [label(sample, time_weight) for sample in samples]
+    thresholds = {
+        feature: sorted({sample[feature] for sample in samples}) for feature in ThresholdRule.FEATURES
+    }
+    # A threshold at the largest observed value means "never use the large optimizer"
+    candidates = [[{"feature": "size", "value": thresholds["size"][-1]}]]
+    for feature in ThresholdRule.FEATURES:
+        candidates += [[{"feature": feature, "value": value}] for value in thresholds[feature]]
+    for first, second in itertools.combinations(ThresholdRule.FEATURES, 2):
+        candidates += [
+            [{"feature": first, "value": a}, {"feature": second, "value": b}]
+            for a in thresholds[first] for b in thresholds[second]
+        ]
+    best_rule, best_accuracy = None, -1.0
+    for conditions in candidates:
+        rule = ThresholdRule(conditions, source="fit")
+        accuracy = sum(rule.use_large(sample) == target for sample, target in zip(samples, labels)) / len(samples)
+        if accuracy > best_accuracy:
+            best_rule, best_accuracy = rule, accuracy
+    return best_rule, best_accuracy
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the small/large optimizer decision rule from benchmarks.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[10, 25, 50, 100, 200, 400, 800])
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--time-weight", type=float, default=0.05, help="Reduction fraction one second is worth")
+    parser.add_argument("--zx-time-budget", type=float, default=60.0)
+    parser.add_argument("--output", default=DEFAULT_THRESHOLD_CONFIG)
+    args = parser.parse_args()
+
+    results = benchmark(args.scales, args.seeds, args.zx_time_budget)
+    failed = sum(1 for sample in results if sample.get("failed"))
+    if failed:
+        logging.warning(f"{failed}/{len(results)} samples had a failed optimizer run and are excluded from the fit.")
+    rule, accuracy = fit_rule(results, args.time_weight)
+    rule.save(args.output, {
+        "accuracy": round(accuracy, 4),
+        "samples": len(results) - failed,
+        "failed_samples": failed,
+        "time_weight": args.time_weight,
+        "scales": args.scales,
+        "fitted_dt": datetime.now().isoformat()
+    })
+    print(f"Saved rule {rule.conditions} with accuracy {accuracy:.2%} to {args.output}")
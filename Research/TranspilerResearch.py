@@ -10,22 +10,38 @@ from mitiq.pec.representations.depolarizing import represent_operation_with_loca
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import logging
-import hashlib
 import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+from services.circuit_summary import CircuitSummary
+from services.gate_registry import GATE_REGISTRY, QISKIT_GATES_BY_NAME
 
 # Configure logging for production use
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Cirq gate (or rotation type) -> registry entry, for gates that have a Qiskit name to emit
+CIRQ_GATES = {
+    spec.cirq: spec for spec in GATE_REGISTRY.values()
+    if spec.qiskit_name and spec.cirq is not None and not spec.param_count
+}
+CIRQ_ROTATIONS = {
+    type(spec.cirq(0.0)): spec for spec in GATE_REGISTRY.values()
+    if spec.qiskit_name and spec.cirq is not None and spec.param_count
+}
+
 class QuantumCircuitTranspiler:
     def __init__(self, circuit_input: Union[cirq.Circuit, QuantumCircuit, str], input_backend: str, noise_level: float = 0.01):
         self.input_backend = input_backend.lower()
         self.noise_level = noise_level
         self.circuit = self._parse_circuit(circuit_input)
         self.validate_input()
+        self.summary = CircuitSummary.from_circuit(self.circuit)
         self.mitiq_circuit, _ = self._convert_to_mitiq()
-        self.circuit_id = self._generate_circuit_id()
-        self.num_qubits = self._get_num_qubits()
+        self.circuit_id = self.summary.fingerprint
+        self.num_qubits = self.summary.num_qubits
         logger.info(f"Initialized transpiler for {self.input_backend} circuit with ID: {self.circuit_id}, {self.num_qubits} qubits")
 
     def _parse_circuit(self, circuit_input: Union[cirq.Circuit, QuantumCircuit, str]) -> Union[cirq.Circuit, QuantumCircuit]:
@@ -41,47 +57,22 @@ class QuantumCircuitTranspiler:
             raise ValueError("Input backend must be 'cirq' or 'qiskit'")
         if not isinstance(self.circuit, (cirq.Circuit, QuantumCircuit)):
             raise ValueError(f"Invalid circuit type for {self.input_backend}")
-
-    def _generate_circuit_id(self) -> str:
-        circuit_str = str(self.circuit)
-        return hashlib.md5(circuit_str.encode()).hexdigest()
+        # Simulation, mitigation and the code emitter all need numeric angles
+        if isinstance(self.circuit, QuantumCircuit) and self.circuit.parameters:
+            raise ValueError(f"Unbound parameters {sorted(p.name for p in self.circuit.parameters)}; bind them before transpiling")
+        if isinstance(self.circuit, cirq.Circuit) and cirq.is_parameterized(self.circuit):
+            raise ValueError(f"Unbound parameters {sorted(map(str, cirq.parameter_names(self.circuit)))}; resolve them before transpiling")
 
     def _convert_to_mitiq(self) -> Tuple[Any, str]:
-        if self.input_backend == 'cirq':
-            return convert_to_mitiq(cirq.Circuit(self._get_operations()))
         return convert_to_mitiq(self.circuit)
 
-    def _get_num_qubits(self) -> int:
-        if self.input_backend == 'cirq':
-            qubits = set()
-            for op in self.circuit.all_operations():
-                qubits.update(op.qubits)
-            return len(qubits)
-        return self.circuit.num_qubits
-
     def _get_operations(self) -> List[Any]:
         if self.input_backend == 'cirq':
             return list(self.circuit.all_operations())
         return [instr.operation for instr in self.circuit.data]
 
-    def _is_clifford_gate(self, gate: Any) -> bool:
-        if not gate:
-            return False
-        if self.input_backend == 'cirq':
-            clifford_types = (type(cirq.H), type(cirq.CNOT), type(cirq.S), type(cirq.Z), type(cirq.X), type(cirq.Y))
-            return isinstance(gate, clifford_types) or \
-                   (isinstance(gate, cirq.XPowGate) and gate.exponent in {0.5, 1, -1, -0.5})
-        return getattr(gate, 'name', '') in ['h', 'cx', 's', 'sdg', 'z', 'x', 'y']
-
     def _count_gate_types(self) -> Tuple[int, int]:
-        clifford_count = non_clifford_count = 0
-        for op in self._get_operations():
-            gate = getattr(op, 'gate', op) if self.input_backend == 'cirq' else op
-            if self._is_clifford_gate(gate):
-                clifford_count += 1
-            elif gate is not None:
-                non_clifford_count += 1
-        return clifford_count, non_clifford_count
+        return self.summary.clifford_count, self.summary.non_clifford_count
 
     def _select_mitigation_strategy(self) -> Callable:
         clifford_count, non_clifford_count = self._count_gate_types()
@@ -208,95 +199,51 @@ class QuantumCircuitTranspiler:
             _, energy = executor(self.circuit, self.noise_level)
             return mitigated_exp, energy
 
+    def _registry_operations(self) -> List[Tuple[Any, List[float], List[int]]]:
+        """Resolve every operation to its gate registry entry, parameters and qubit indices.
+
+        Operations with no registry entry (measurements, custom gates) are left out of the emitted
+        code and logged.
+        """
+        resolved, skipped = [], []
+        if self.input_backend == 'cirq':
+            # Same qubit order as CircuitSummary.num_qubits, whatever the qubit type
+            index = {q: i for i, q in enumerate(sorted(self.circuit.all_qubits()))}
+            for op in self.circuit.all_operations():
+                gate = getattr(op, 'gate', None)
+                qubits = [index[q] for q in op.qubits]
+                if type(gate) in CIRQ_ROTATIONS:
+                    resolved.append((CIRQ_ROTATIONS[type(gate)], [float(gate._rads)], qubits))
+                    continue
+                try:
+                    spec = CIRQ_GATES.get(gate)
+                except TypeError:
+                    spec = None
+                if spec is not None:
+                    resolved.append((spec, [], qubits))
+                else:
+                    skipped.append(type(gate if gate is not None else op).__name__)
+        else:
+            for instruction in self.circuit.data:
+                spec = QISKIT_GATES_BY_NAME.get(instruction.operation.name)
+                params = [float(p) for p in instruction.operation.params]
+                if spec is not None and spec.cirq is not None and len(params) == spec.param_count:
+                    resolved.append((spec, params, [self.circuit.find_bit(q).index for q in instruction.qubits]))
+                else:
+                    skipped.append(instruction.operation.name)
+        if skipped:
+            logger.warning(f"Circuit {self.circuit_id}: no registry gate for {sorted(set(skipped))}; left out of the transpiled code")
+        return resolved
+
     def transpile(self) -> Dict[str, str]:
-        cirq_code = ["import cirq", f"circuit = cirq.Circuit()", f"qubits = [cirq.LineQubit(i) for i in range({self.num_qubits})]"]
+        cirq_code = ["import cirq", "import numpy as np", f"circuit = cirq.Circuit()", f"qubits = [cirq.LineQubit(i) for i in range({self.num_qubits})]"]
         qiskit_code = ["from qiskit import QuantumCircuit", f"qc = QuantumCircuit({self.num_qubits})"]
 
-        operations = self._get_operations()
-        for op in operations:
-            if self.input_backend == 'cirq':
-                gate = getattr(op, 'gate', None)
-                if gate:
-                    qubits = [q.id for q in op.qubits]
-                    if isinstance(gate, cirq.H):
-                        cirq_code.append(f"circuit.append(cirq.H(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.h({qubits[0]})")
-                    elif isinstance(gate, cirq.X):
-                        cirq_code.append(f"circuit.append(cirq.X(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.x({qubits[0]})")
-                    elif isinstance(gate, cirq.Y):
-                        cirq_code.append(f"circuit.append(cirq.Y(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.y({qubits[0]})")
-                    elif isinstance(gate, cirq.Z):
-                        cirq_code.append(f"circuit.append(cirq.Z(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.z({qubits[0]})")
-                    elif isinstance(gate, cirq.T):
-                        cirq_code.append(f"circuit.append(cirq.T(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.t({qubits[0]})")
-                    elif isinstance(gate, cirq.S):
-                        cirq_code.append(f"circuit.append(cirq.S(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.s({qubits[0]})")
-                    elif isinstance(gate, cirq.S**-1):
-                        cirq_code.append(f"circuit.append(cirq.S(qubits[{qubits[0]}])**-1)")
-                        qiskit_code.append(f"qc.sdg({qubits[0]})")
-                    elif isinstance(gate, cirq.CNOT):
-                        cirq_code.append(f"circuit.append(cirq.CNOT(qubits[{qubits[0]}], qubits[{qubits[1]}]))")
-                        qiskit_code.append(f"qc.cx({qubits[0]}, {qubits[1]})")
-                    elif isinstance(gate, cirq.SWAP):
-                        cirq_code.append(f"circuit.append(cirq.SWAP(qubits[{qubits[0]}], qubits[{qubits[1]}]))")
-                        qiskit_code.append(f"qc.swap({qubits[0]}, {qubits[1]})")
-                    elif isinstance(gate, cirq.Rx):
-                        theta = gate._angle
-                        cirq_code.append(f"circuit.append(cirq.rx({theta})(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.rx({theta}, {qubits[0]})")
-                    elif isinstance(gate, cirq.Ry):
-                        theta = gate._angle
-                        cirq_code.append(f"circuit.append(cirq.ry({theta})(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.ry({theta}, {qubits[0]})")
-                    elif isinstance(gate, cirq.Rz):
-                        theta = gate._angle
-                        cirq_code.append(f"circuit.append(cirq.rz({theta})(qubits[{qubits[0]}]))")
-                        qiskit_code.append(f"qc.rz({theta}, {qubits[0]})")
-            else:
-                name = op.name
-                qubits = [q.index for q in op.qubits]
-                params = op.params
-                if name == 'h':
-                    cirq_code.append(f"circuit.append(cirq.H(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.h({qubits[0]})")
-                elif name == 'x':
-                    cirq_code.append(f"circuit.append(cirq.X(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.x({qubits[0]})")
-                elif name == 'y':
-                    cirq_code.append(f"circuit.append(cirq.Y(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.y({qubits[0]})")
-                elif name == 'z':
-                    cirq_code.append(f"circuit.append(cirq.Z(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.z({qubits[0]})")
-                elif name == 't':
-                    cirq_code.append(f"circuit.append(cirq.T(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.t({qubits[0]})")
-                elif name == 's':
-                    cirq_code.append(f"circuit.append(cirq.S(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.s({qubits[0]})")
-                elif name == 'sdg':
-                    cirq_code.append(f"circuit.append(cirq.S(qubits[{qubits[0]}])**-1)")
-                    qiskit_code.append(f"qc.sdg({qubits[0]})")
-                elif name == 'cx':
-                    cirq_code.append(f"circuit.append(cirq.CNOT(qubits[{qubits[0]}], qubits[{qubits[1]}]))")
-                    qiskit_code.append(f"qc.cx({qubits[0]}, {qubits[1]})")
-                elif name == 'swap':
-                    cirq_code.append(f"circuit.append(cirq.SWAP(qubits[{qubits[0]}], qubits[{qubits[1]}]))")
-                    qiskit_code.append(f"qc.swap({qubits[0]}, {qubits[1]})")
-                elif name == 'rx' and params:
-                    cirq_code.append(f"circuit.append(cirq.rx({params[0]})(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.rx({params[0]}, {qubits[0]})")
-                elif name == 'ry' and params:
-                    cirq_code.append(f"circuit.append(cirq.ry({params[0]})(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.ry({params[0]}, {qubits[0]})")
-                elif name == 'rz' and params:
-                    cirq_code.append(f"circuit.append(cirq.rz({params[0]})(qubits[{qubits[0]}]))")
-                    qiskit_code.append(f"qc.rz({params[0]}, {qubits[0]})")
+        for spec, params, qubits in self._registry_operations():
+            cirq_gate = spec.cirq(*params) if spec.param_count else spec.cirq
+            targets = ", ".join(f"qubits[{q}]" for q in qubits)
+            cirq_code.append(f"circuit.append({cirq_gate!r}({targets}))")
+            qiskit_code.append(f"qc.{spec.qiskit_name}({', '.join(str(value) for value in params + qubits)})")
 
         cirq_code.append("print(circuit)")
         qiskit_code.append("print(qc)")
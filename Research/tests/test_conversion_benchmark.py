@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+pytest.importorskip("cirq")
+pytest.importorskip("ply")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ConversionBenchmark import TWO_QUBIT_GATES, run_benchmark
+
+def test_run_benchmark_smoke():
+    assert "swap" in TWO_QUBIT_GATES
+    rows = run_benchmark([20], num_qubits=3, repeats=1)
+    assert len(rows) == 1
+    assert rows[0]["gates"] == 20
+    assert all(rows[0][key] >= 0 for key in rows[0] if key != "gates")
@@ -0,0 +1,65 @@
+import os
+import random
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+pytest.importorskip("pyzx")
+pytest.importorskip("cirq")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qiskit import QuantumCircuit
+from Optimization import EquivalenceVerifier, LargeCircuitOptimizer, PortfolioOptimizer
+
+def clifford_t_circuit(num_qubits: int = 5, num_gates: int = 120, seed: int = 1, swap_rate: float = 0.0) -> QuantumCircuit:
+    rng = random.Random(seed)
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        draw = rng.random()
+        if draw < swap_rate:
+            qc.swap(*rng.sample(range(num_qubits), 2))
+        elif draw < swap_rate + 0.3:
+            control, target = rng.sample(range(num_qubits), 2)
+            qc.cx(control, target)
+        else:
+            getattr(qc, rng.choice(["h", "s", "t", "tdg", "x", "z"]))(rng.randrange(num_qubits))
+    return qc
+
+def test_anytime_optimization_returns_smaller_equivalent_circuit():
+    circuit = clifford_t_circuit()
+    optimizer = LargeCircuitOptimizer(time_budget=30.0)
+    optimized = optimizer.optimize(circuit)
+    assert optimized.num_qubits == circuit.num_qubits
+    assert optimized.size() < circuit.size()
+    assert EquivalenceVerifier(seed=7).verify(circuit, optimized)["equivalent"] is True
+    assert optimizer.progress["rounds_completed"] >= 1
+    assert optimizer.progress["best_gates"] == optimized.size()
+
+def test_full_reduce_returns_smaller_equivalent_circuit():
+    circuit = clifford_t_circuit(seed=2)
+    optimized = LargeCircuitOptimizer().optimize(circuit)
+    assert optimized.size() < circuit.size()
+    assert EquivalenceVerifier(seed=7).verify(circuit, optimized)["equivalent"] is True
+
+def test_portfolio_winner_is_equivalent_when_pipelines_elide_swaps():
+    circuit = clifford_t_circuit(num_gates=150, seed=3, swap_rate=0.2)
+    portfolio = PortfolioOptimizer()
+    optimized = portfolio.optimize(circuit)
+    assert all(result["status"] == "ok" for result in portfolio.last_results)
+    assert optimized.size() < circuit.size()
+    assert EquivalenceVerifier(seed=7).verify(circuit, optimized)["equivalent"] is True
+
+def test_cache_does_not_confuse_measurement_targets():
+    from Optimization import OptimizationCache, QuantumCircuitOptimizer
+    def measured(first_clbit: int, second_clbit: int) -> QuantumCircuit:
+        qc = QuantumCircuit(2, 2)
+        qc.h(0)
+        qc.cx(0, 1)
+        qc.measure(0, first_clbit)
+        qc.measure(1, second_clbit)
+        return qc
+    optimizer = QuantumCircuitOptimizer(size_threshold=50, cache=OptimizationCache(), verify=False)
+    optimizer.optimize(measured(0, 1))
+    swapped = optimizer.optimize(measured(1, 0))
+    targets = {swapped.find_bit(instr.qubits[0]).index: swapped.find_bit(instr.clbits[0]).index
+               for instr in swapped.data if instr.operation.name == "measure"}
+    assert targets == {0: 1, 1: 0}
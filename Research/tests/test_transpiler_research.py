@@ -0,0 +1,28 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("mitiq")
+pytest.importorskip("qiskit_aer")
+sympy = pytest.importorskip("sympy")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import cirq
+from qiskit import QuantumCircuit
+from qiskit.circuit import Parameter
+from TranspilerResearch import QuantumCircuitTranspiler
+
+def test_cirq_grid_qubits_are_indexed_in_sorted_order():
+    a, b = cirq.GridQubit(0, 1), cirq.GridQubit(1, 0)
+    code = QuantumCircuitTranspiler(cirq.Circuit(cirq.H(b), cirq.CNOT(b, a)), "cirq").transpile()["qiskit"]
+    assert "qc.h(1)" in code and "qc.cx(1, 0)" in code
+
+def test_unbound_qiskit_parameters_are_rejected():
+    qc = QuantumCircuit(1)
+    qc.rx(Parameter("theta"), 0)
+    with pytest.raises(ValueError, match="theta"):
+        QuantumCircuitTranspiler(qc, "qiskit")
+
+def test_unbound_cirq_parameters_are_rejected():
+    q = cirq.LineQubit(0)
+    with pytest.raises(ValueError, match="theta"):
+        QuantumCircuitTranspiler(cirq.Circuit(cirq.rx(sympy.Symbol("theta"))(q)), "cirq")
@@ -8,8 +8,9 @@ class PricingPlan(BaseModel):
     status_code : int
     pricing : List
 class CodeRequest(BaseModel):
-    code: str
-    simulator: str
+    code: Optional[str] = None
+    simulator: Optional[str] = None
+    quirk: Optional[str] = None
 class PreviousCircuits(BaseModel):
     status_code : int 
     circuits : Optional[List[dict]]
@@ -23,6 +24,7 @@ class DeqcodeLoginCredentials(BaseModel):
 class QuibitsGeneratorinput(BaseModel):
     username : str = Form(...)
     statements : str = Form(...)
+    variety : bool = False  # ask for a fresh generation instead of a cached one
 
 class DeqcodeUser(BaseModel):
    username : str = Form(...)
@@ -55,9 +57,14 @@ class UserQuery(BaseModel):
     imgdata : Optional[UploadFile] = None
 
 class CircuitInput(BaseModel):
+    circuit : Optional[str] = None
+    backend_type: str = "qiskit"
+    quirk : Optional[str] = None
+    noise_level: float = 0.01
+
+class CircuitSummaryInput(BaseModel):
     circuit : str
     backend_type: str
-    noise_level: float = 0.01
 
 class Enterprise(BaseModel):
     companyname : str
@@ -3,6 +3,7 @@ from fastapi import HTTPException
 from dotenv import load_dotenv
 from services.util import hash_password 
 from bloom_filter2 import BloomFilter
+from datetime import datetime
 import bcrypt
 import os
 import urllib.parse
@@ -110,6 +111,27 @@ class dbhandles:
             except Exception as e:
                 raise HTTPException(status_code=500,detail=f"{e}")
          
+        async def store_quirk_payload(self, payload_hash: str, payload: str):
+            try:
+                collections = self.database["DEQODE_QUIRK_PAYLOADS"]
+                # Content-addressed: an existing hash already holds this exact payload
+                collections.update_one(
+                    {"_id": payload_hash},
+                    {"$setOnInsert": {"payload": payload, "created_dt": datetime.now()}},
+                    upsert=True
+                )
+                return payload_hash
+            except Exception as e:
+                raise HTTPException(status_code=500,detail=f"{e}")
+
+        async def get_quirk_payload(self, payload_hash: str):
+            try:
+                collections = self.database["DEQODE_QUIRK_PAYLOADS"]
+                document = collections.find_one({"_id": payload_hash})
+                return document["payload"] if document else None
+            except Exception as e:
+                raise HTTPException(status_code=500,detail=f"{e}")
+
         async def del_user_logs(self):
             pass
          
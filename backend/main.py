@@ -3,28 +3,50 @@ import jwt
 import json
 import secrets
 import smtplib
-from fastapi import FastAPI , Depends 
+from contextlib import asynccontextmanager
+from fastapi import FastAPI , Depends , Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.exceptions import HTTPException
 from fastapi.templating import Jinja2Templates
 from db.db_handler import dbhandles
 from db.datahandler import QuibitsGeneratorinput,DeqcodeUser,DeqcodeUserLogin,CodeRequest , UserQuery
 from db.datahandler import PreviousCircuits,CircuitViewer,PricingPlan,DeqcodeLoginCredentials,CircuitInput
-from services.quirk_circuit_generator import QuantumLLM
+from db.datahandler import CircuitSummaryInput
+from services.quirk_circuit_generator import LLM_HEDGES, QuantumLLM
 from services.simulation import QuantumSimulator
-from services.algassertprod import QuantumCircuitGenerator
-from services.util import create_session_token , remove_code
+from services.algassertprod import GateJsonCompiler, QuantumCircuitGenerator
+from services.gate_stream import IncrementalGateParser
+from services.util import create_session_token , extract_json_from_content , remove_code
 from services.ErrorCorrectioncodes import QuantumErrorMitigator
+from services.circuit_summary import CircuitSummary, parse_circuit
+from services.quirk_payload import quirk_payload_hash, quirk_short_link_hash, quirk_url_from_payload
+from services.quirk_importer import QuirkImporter
+from services.semantic_cache import SemanticCache
+from services.llm_cache import LLMResponseCache
+from services.single_flight import SingleFlight
+from services.metrics import current_request_timings, merge_request_timings, render_metrics, server_timing_header, start_request_timings, timed, timings_ms
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from dotenv import load_dotenv
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One LLM client per worker, reused by every /design-circuit request
+    app.state.quantum_llm = QuantumLLM(cache=LLMResponseCache())
+    app.state.semantic_cache = SemanticCache().load()
+    app.state.design_flights = SingleFlight()
+    yield
+    await app.state.quantum_llm.aclose()
+
+app = FastAPI(lifespan=lifespan)
 secret = secrets.token_hex(32)
 SECRET_KEY = secret
 
 load_dotenv()
+PUBLIC_URL = os.environ.get("DEQCODE_PUBLIC_URL", "").rstrip("/")
+quirk_importer = QuirkImporter()
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,6 +59,21 @@ app.add_middleware(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="session_token")
 templates = Jinja2Templates(directory="templates")
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    # Stages recorded while handling the request are summed per request and reported as Server-Timing.
+    # A semantic-cache hit only reports db and total; streamed responses send their headers before any
+    # stage runs, so /design-circuit/stream reports its stages in a "timing" event instead.
+    timings = start_request_timings()
+    with timed("total"):
+        response = await call_next(request)
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 def app_health():
     return {"health":"DeqcodeAI"}
@@ -118,29 +155,156 @@ async def view_circuits(viewer : CircuitViewer):
     except Exception as e:
       raise HTTPException(status_code=500,detail=f"{e}")
 
+def build_design_circuit(resposnes: dict):
+    try:
+      with timed("build"):
+        code , response = remove_code(resposnes)
+        qc, generator, diagnostics = QuantumCircuitGenerator.build_from_json(response)
+        quirk_payload = generator.generate_compact_payload()
+      #print(qc)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error Qiskit:{e}")
+    return code, response, quirk_payload, diagnostics
+
+def validate_design_circuit(resposnes: dict):
+    # Hedging accepts a response once it builds with no gate dropped as an error
+    built = build_design_circuit(resposnes)
+    return built, not any(item["level"] == "error" for item in built[3])
+
+async def build_design_result(db, statements: str, resposnes: dict, built=None) -> dict:
+    code, resposnes, quirk_payload, diagnostics = built if built is not None else build_design_circuit(resposnes)
+    with timed("db"):
+      quirk_hash = await db.store_quirk_payload(quirk_payload_hash(quirk_payload), quirk_payload)
+    # "url" stays a full Quirk link the frontend can embed; "short_url" is relative unless DEQCODE_PUBLIC_URL is set
+    result = {"Response":resposnes,"url":quirk_url_from_payload(quirk_payload),"short_url":f"{PUBLIC_URL}/q/{quirk_hash}","quirk_hash":quirk_hash,"code":code,"content":resposnes.get("explanation"),"diagnostics":diagnostics}
+    app.state.semantic_cache.add(statements, result)
+    return result
+
 @app.post("/design-circuit")
 async def design_circuit(QuiBitsGeneratorinput: QuibitsGeneratorinput):
     try:
-      quantum_verifier = QuantumLLM()
+      quantum_verifier = app.state.quantum_llm
       db = dbhandles()
       print(QuiBitsGeneratorinput.statements) #Comment After Execution during Production
-      resposnes = quantum_verifier.llm_request(QuiBitsGeneratorinput.statements)
-      try:
-        code , response = remove_code(resposnes)
-        qc, quirk_url = QuantumCircuitGenerator.generate_circuit_from_json(response)
-        #print(qc)
-      except Exception as e:
-          raise HTTPException(status_code=500, detail=f"Error Qiskit:{e}")
-      result = {"Response":resposnes,"url":quirk_url,"code":code,"content":resposnes.get("explanation")}
+      semantic_hit = None if QuiBitsGeneratorinput.variety else app.state.semantic_cache.lookup(QuiBitsGeneratorinput.statements)
+      if semantic_hit is not None:
+        cached_result, similarity = semantic_hit
+        result = dict(cached_result, cache={"level": "semantic", "similarity": round(similarity, 4)})
+        with timed("db"):
+          storage_circuit = await db.get_store_circuit(QuiBitsGeneratorinput.username,result)
+        if storage_circuit: return result
+      async def generate():
+        # Returns the stage timings alongside the result so coalesced followers can report the leader's
+        if LLM_HEDGES > 1:
+          resposnes, built = await quantum_verifier.hedged_request(QuiBitsGeneratorinput.statements, validate_design_circuit, use_cache=not QuiBitsGeneratorinput.variety)
+          return await build_design_result(db, QuiBitsGeneratorinput.statements, resposnes, built), current_request_timings()
+        resposnes = await quantum_verifier.llm_request(QuiBitsGeneratorinput.statements, use_cache=not QuiBitsGeneratorinput.variety)
+        return await build_design_result(db, QuiBitsGeneratorinput.statements, resposnes), current_request_timings()
+      if QuiBitsGeneratorinput.variety:
+        result, _ = await generate()
+      else:
+        # Concurrent identical statements share one LLM call; each user still gets their own stored copy
+        (result, leader_timings), shared = await app.state.design_flights.do(quantum_verifier.cache_key(QuiBitsGeneratorinput.statements), generate)
+        if shared:
+          result = dict(result, coalesced=True)
+          merge_request_timings(leader_timings)
       print(QuiBitsGeneratorinput.username)
-      storage_circuit = await db.get_store_circuit(QuiBitsGeneratorinput.username,result)
+      with timed("db"):
+        storage_circuit = await db.get_store_circuit(QuiBitsGeneratorinput.username,result)
       if storage_circuit: return result
+    except HTTPException:
+      raise
     except Exception as e:
       raise HTTPException(status_code=500,detail=f"Error: {e}")
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def validated_gate_event(index: int, gate: dict, parameters) -> dict:
+    gates, _, diagnostics = GateJsonCompiler.normalize({"Parameters": parameters or [{}], "gates": [gate]})
+    for item in diagnostics:
+        item["index"] = index
+    return {"index": index, "gate": gates[0] if gates else None, "raw": gate, "diagnostics": diagnostics}
+
+@app.post("/design-circuit/stream")
+async def design_circuit_stream(QuiBitsGeneratorinput: QuibitsGeneratorinput):
+    """Server-sent events: one "gate" event per gate as soon as the LLM closes it, "timing" with the
+    stage durations in milliseconds, then "done" with the stored result."""
+    statements = QuiBitsGeneratorinput.statements
+
+    async def events():
+        db = dbhandles()
+        try:
+            semantic_hit = None if QuiBitsGeneratorinput.variety else app.state.semantic_cache.lookup(statements)
+            if semantic_hit is not None:
+                cached_result, similarity = semantic_hit
+                cached_response = cached_result.get("Response") or {}
+                for index, gate in enumerate(cached_response.get("gates") or []):
+                    yield sse_event("gate", validated_gate_event(index, gate, cached_response.get("Parameters")))
+                result = dict(cached_result, cache={"level": "semantic", "similarity": round(similarity, 4)})
+            else:
+                parser = IncrementalGateParser()
+                index = 0
+                async for chunk in app.state.quantum_llm.llm_stream(statements):
+                    for gate in parser.feed(chunk):
+                        yield sse_event("gate", validated_gate_event(index, gate, parser.parameters))
+                        index += 1
+                with timed("parse"):
+                    resposnes = extract_json_from_content(parser.text)
+                result = await build_design_result(db, statements, resposnes)
+            with timed("db"):
+                await db.get_store_circuit(QuiBitsGeneratorinput.username, result)
+            # The Server-Timing header went out before the first event, so the stages come as an event
+            yield sse_event("timing", timings_ms(current_request_timings()))
+            yield sse_event("done", result)
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            yield sse_event("error", {"status_code": 500, "detail": f"Error: {e}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/q/{quirk_hash}")
+async def quirk_short_link(quirk_hash: str):
+    try:
+        db = dbhandles()
+        payload = await db.get_quirk_payload(quirk_hash)
+    except Exception as e:
+        raise HTTPException(status_code=500,detail=f"Error: {e}")
+    if payload is None:
+        raise HTTPException(status_code=404,detail="Circuit link not found")
+    return RedirectResponse(url=quirk_url_from_payload(payload), status_code=307)
+
+async def import_quirk_circuit(source: str):
+    # Accepts a Quirk URL, {"cols": ...} JSON, or one of our /q/{hash} short links
+    quirk_hash = quirk_short_link_hash(source)
+    if quirk_hash is None and "/q/" in source and "circuit=" not in source:
+        raise HTTPException(status_code=400, detail="Invalid Quirk short link")
+    if quirk_hash is not None:
+        source = await dbhandles().get_quirk_payload(quirk_hash)
+        if source is None:
+            raise HTTPException(status_code=404, detail="Quirk link not found")
+    try:
+        circuit, diagnostics = quirk_importer.parse(source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Quirk circuit: {e}")
+    # Dropped gates would silently change the results, so partial circuits are refused
+    errors = [item for item in diagnostics if item["level"] == "error"]
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Quirk circuit contains unsupported gates", "diagnostics": errors})
+    return circuit, diagnostics
+
 @app.post("/simulate")
 async def simulate_code(request: CodeRequest):
     simulator = QuantumSimulator()
+    if request.quirk:
+        circuit, diagnostics = await import_quirk_circuit(request.quirk)
+        try:
+            result = simulator.qiskit_circuit_simulate(circuit)
+            result_map = simulator.generate_qiskit_histogram(result)
+            return {"result": result, "resultmap": result_map, "diagnostics": diagnostics}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
     if not request.code or not request.simulator:
         raise HTTPException(status_code=400, detail="Code and simulator type are required")
     try:
@@ -164,8 +328,17 @@ async def simulate_code(request: CodeRequest):
 
 @app.post("/mitigate")
 async def mitigate_circuit(input: CircuitInput):
-    circuit = input.circuit
-    mitigator = QuantumErrorMitigator(circuit, input.backend_type, input.noise_level)
+    if input.quirk:
+        circuit, _ = await import_quirk_circuit(input.quirk)
+        circuit, backend_type = circuit.remove_final_measurements(inplace=False), "qiskit"
+    elif input.circuit:
+        try:
+            circuit, backend_type = parse_circuit(input.circuit, input.backend_type), input.backend_type
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        raise HTTPException(status_code=400, detail="A circuit or Quirk link is required")
+    mitigator = QuantumErrorMitigator(circuit, backend_type, input.noise_level)
     results = mitigator.get_results()
     return {
         "status": "success",
@@ -178,6 +351,17 @@ async def mitigate_circuit(input: CircuitInput):
         }
     }
     
+@app.post("/circuit-summary")
+async def circuit_summary(input: CircuitSummaryInput):
+    try:
+        circuit = parse_circuit(input.circuit, input.backend_type)
+        summary = CircuitSummary.from_circuit(circuit)
+        return {"status": "success", "summary": summary.to_dict()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {e}")
+
 @app.post("/query")
 async def query(querymsg : UserQuery):
     try:
@@ -251,8 +435,7 @@ async def transfercircuit():
 #Testing not a valid circuit api for production - caution : Don't use in documentation
 @app.post("/generate_circuit")
 async def generate_circuit(parameters: list, gates: list):
-    llm = QuantumLLM()
-    response = llm.llm_request(parameters, gates)
+    response = await app.state.quantum_llm.llm_request(json.dumps({"Parameters": parameters, "gates": gates}))
     generator = QuantumCircuitGenerator()
     generator.add_qubits(3)
     generator.add_gate("H", [0])
@@ -10,7 +10,7 @@ from mitiq.pec.representations.depolarizing import represent_operation_with_loca
 from pydantic import BaseModel
 import logging
 import math
-import hashlib
+from services.circuit_summary import CircuitSummary
 
 # Configure logging for production use
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,8 +22,9 @@ class QuantumErrorMitigator:
         self.backend_type = backend_type.lower()
         self.noise_level = noise_level
         self.validate_input()
+        self.summary = CircuitSummary.from_circuit(self.circuit)
         self.mitiq_circuit, _ = self._convert_to_mitiq()
-        self.circuit_id = self._generate_circuit_id()
+        self.circuit_id = self.summary.fingerprint
         logger.info(f"Initialized mitigator for {self.backend_type} circuit with ID: {self.circuit_id}")
 
     def validate_input(self) -> None:
@@ -32,38 +33,16 @@ class QuantumErrorMitigator:
         if not isinstance(self.circuit, (cirq.Circuit, QuantumCircuit)):
             raise ValueError(f"Invalid circuit type for {self.backend_type}")
 
-    def _generate_circuit_id(self) -> str:
-        circuit_str = str(self.circuit)
-        return hashlib.md5(circuit_str.encode()).hexdigest()
-
     def _convert_to_mitiq(self) -> Tuple[Any, str]:
-        if self.backend_type == 'cirq':
-            return convert_to_mitiq(cirq.Circuit(self._get_operations()))
         return convert_to_mitiq(self.circuit)
 
-    def _is_clifford_gate(self, gate: Any) -> bool:
-        if not gate:
-            return False
-        if self.backend_type == 'cirq':
-            clifford_types = (type(cirq.H), type(cirq.CNOT), type(cirq.S), type(cirq.Z))
-            return isinstance(gate, clifford_types) or \
-                   (isinstance(gate, cirq.XPowGate) and gate.exponent in {0.5, 1, -1, -0.5})
-        return getattr(gate, 'name', '') in ['h', 'cx', 's', 'sdg', 'z']
-
     def _get_operations(self) -> List[Any]:
         if self.backend_type == 'cirq':
             return list(self.circuit.all_operations())
         return [instr.operation for instr in self.circuit.data]
 
     def _count_gate_types(self) -> Tuple[int, int]:
-        clifford_count = non_clifford_count = 0
-        for op in self._get_operations():
-            gate = getattr(op, 'gate', op) if self.backend_type == 'cirq' else op
-            if self._is_clifford_gate(gate):
-                clifford_count += 1
-            elif gate is not None:
-                non_clifford_count += 1
-        return clifford_count, non_clifford_count
+        return self.summary.clifford_count, self.summary.non_clifford_count
 
     def _select_mitigation_strategy(self) -> Callable:
         clifford_count, non_clifford_count = self._count_gate_types()
@@ -1,15 +1,245 @@
+import ast
 import json
 import math
+import operator
 import urllib.parse
 from qiskit import QuantumCircuit
+from services.gate_registry import GATE_REGISTRY, SCHEMA_GATES
+from services.quirk_payload import encode_quirk_payload
 
-class QuantumCircuitGenerator:
-    supported_gates = {
-        "H", "X", "Y", "Z", "S", "T", "CX", "CCX", "SWAP", "RX", "RY", "RZ",
-        "Measure", "InputA", "InputB", "InputC", "Ryft", "ZDetector", "YDetector", "ZDetectControlReset"
+class GatePeepholeOptimizer:
+    """Single left-to-right pass over LLM gate JSON that removes redundant gates before circuit construction.
+
+    Each qubit keeps a stack of the surviving gates that touch it, so a gate only interacts with the
+    gate directly before it on exactly the same qubits: self-inverse pairs cancel (cascading, e.g.
+    H X X H), same-axis rotations merge and rotations by a multiple of 2*pi are dropped.
+    Measurements and gates whose qubits cannot be resolved act as barriers.
+    """
+    involutions = {"H", "X", "Y", "Z", "CX", "SWAP", "CCX"}
+    rotations = {"RX", "RY", "RZ"}
+    arity = {name: GATE_REGISTRY[name].arity for name in SCHEMA_GATES if GATE_REGISTRY[name].qiskit is not None}
+    tolerance = 1e-9
+
+    @staticmethod
+    def _qubits(gate_info):
+        if any(key in gate_info for key in ("control_qubit", "target_qubit", "controls", "targets")):
+            return None
+        qubits = gate_info.get("qubits", [])
+        if isinstance(qubits, int):
+            return [qubits]
+        if not qubits:
+            qubit = gate_info.get("qubit", 0)
+            return [qubit] if isinstance(qubit, int) else None
+        return list(qubits) if all(isinstance(q, int) for q in qubits) else None
+
+    @staticmethod
+    def _angle(gate_info):
+        params = gate_info.get("params", gate_info.get("angle", []))
+        if isinstance(params, (int, float)):
+            return float(params)
+        if isinstance(params, list) and len(params) == 1 and isinstance(params[0], (int, float)):
+            return float(params[0])
+        return None
+
+    @classmethod
+    def _key(cls, gate, qubits):
+        if gate == "SWAP":
+            return frozenset(qubits)
+        if gate == "CCX":
+            return (frozenset(qubits[:2]), qubits[2])
+        return tuple(qubits)
+
+    @classmethod
+    def _is_identity_rotation(cls, angle):
+        remainder = math.fmod(abs(angle), 2 * math.pi)
+        return remainder < cls.tolerance or 2 * math.pi - remainder < cls.tolerance
+
+    @classmethod
+    def optimize(cls, gates):
+        output = []
+        stacks = {}
+        stats = {"input_gates": len(gates), "cancelled": 0, "merged": 0, "dropped": 0}
+        for gate_info in gates:
+            gate = gate_info.get("gate") if isinstance(gate_info, dict) else None
+            qubits = cls._qubits(gate_info) if gate is not None else None
+            if gate not in cls.arity or qubits is None or len(qubits) != cls.arity[gate] or len(set(qubits)) != len(qubits):
+                if gate == "Measure" or qubits is None:
+                    stacks = {}
+                else:
+                    for q in qubits:
+                        stacks.setdefault(q, []).append(len(output))
+                output.append(gate_info)
+                continue
+            angle = cls._angle(gate_info) if gate in cls.rotations else None
+            if angle is not None and cls._is_identity_rotation(angle):
+                stats["dropped"] += 1
+                continue
+            tops = {stacks[q][-1] if stacks.get(q) else None for q in qubits}
+            previous_index = tops.pop() if len(tops) == 1 else None
+            previous = output[previous_index] if previous_index is not None else None
+            if previous is not None and previous.get("gate") == gate:
+                previous_qubits = cls._qubits(previous)
+                if previous_qubits is not None and cls._key(gate, previous_qubits) == cls._key(gate, qubits):
+                    if gate in cls.involutions:
+                        output[previous_index] = None
+                        for q in qubits:
+                            stacks[q].pop()
+                        stats["cancelled"] += 2
+                        continue
+                    previous_angle = cls._angle(previous)
+                    if angle is not None and previous_angle is not None:
+                        merged_angle = previous_angle + angle
+                        if cls._is_identity_rotation(merged_angle):
+                            output[previous_index] = None
+                            for q in qubits:
+                                stacks[q].pop()
+                            stats["dropped"] += 1
+                        else:
+                            merged = {k: v for k, v in previous.items() if k != "angle"}
+                            merged["params"] = [merged_angle]
+                            output[previous_index] = merged
+                        stats["merged"] += 1
+                        continue
+            for q in qubits:
+                stacks.setdefault(q, []).append(len(output))
+            output.append(gate_info)
+        optimized = [gate_info for gate_info in output if gate_info is not None]
+        stats["output_gates"] = len(optimized)
+        return optimized, stats
+
+class GateJsonCompiler:
+    """Compiles LLM gate JSON into a Qiskit circuit and Quirk columns through a gate dispatch table.
+
+    ``normalize`` folds every schema variant the prompt produces ("qubits" list or int, "qubit",
+    "control_qubit"/"target_qubit", "params" list or number, numeric or expression "angle",
+    lower-case or aliased gate names) into ``{"gate", "qubits", "params"}`` in one pass.
+    ``compile`` then appends prebuilt gate objects, adds a single ``measure_all`` however many
+    Measure entries there are, and reports problems as diagnostics instead of printing them.
+    """
+    # name -> (arity, parameter count, prebuilt gate or rotation class); None marks Quirk-only gates
+    gate_table = {
+        name: (GATE_REGISTRY[name].arity, GATE_REGISTRY[name].param_count, GATE_REGISTRY[name].qiskit)
+        for name in SCHEMA_GATES if name != "Measure"
     }
+    aliases = {name.upper(): name for name in list(gate_table) + ["Measure"]}
+    aliases.update({"CNOT": "CX", "TOFFOLI": "CCX", "MEASUREMENT": "Measure", "M": "Measure"})
+    angle_functions = {name: getattr(math, name) for name in ("sin", "cos", "tan", "asin", "acos", "atan", "sqrt", "exp", "log")}
+    angle_operators = {
+        ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+        ast.Pow: operator.pow, ast.USub: operator.neg, ast.UAdd: operator.pos
+    }
+
+    @classmethod
+    def evaluate_angle(cls, expression, variables):
+        """Safely evaluate an angle such as ``"acos(sqrt(p))"`` or ``"pi/4"`` against the JSON Parameters."""
+        def evaluate(node):
+            if isinstance(node, ast.Expression):
+                return evaluate(node.body)
+            if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+                return float(node.value)
+            if isinstance(node, ast.Name) and node.id in variables:
+                return float(variables[node.id])
+            if isinstance(node, ast.BinOp) and type(node.op) in cls.angle_operators:
+                return cls.angle_operators[type(node.op)](evaluate(node.left), evaluate(node.right))
+            if isinstance(node, ast.UnaryOp) and type(node.op) in cls.angle_operators:
+                return cls.angle_operators[type(node.op)](evaluate(node.operand))
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in cls.angle_functions:
+                return cls.angle_functions[node.func.id](*(evaluate(arg) for arg in node.args))
+            raise ValueError(f"unsupported angle expression '{expression}'")
+        return evaluate(ast.parse(str(expression).replace("π", "pi"), mode="eval"))
+
+    @staticmethod
+    def _as_list(value):
+        if value is None:
+            return []
+        return list(value) if isinstance(value, (list, tuple)) else [value]
+
+    @classmethod
+    def normalize(cls, input_data):
+        parameters = (input_data.get("Parameters") or [{}])[0]
+        parameters = parameters if isinstance(parameters, dict) else {}
+        variables = {"pi": math.pi, "e": math.e}
+        variables.update({k: v for k, v in parameters.items() if isinstance(k, str) and isinstance(v, (int, float))})
+        n = parameters.get("n", parameters.get("n_qubits", parameters.get("num_qubits", 1)))
+        diagnostics = []
+        gates = []
+        for index, gate_info in enumerate(input_data.get("gates", [])):
+            if not isinstance(gate_info, dict):
+                diagnostics.append({"index": index, "gate": None, "level": "error", "message": "gate entry is not an object"})
+                continue
+            raw_name = str(gate_info.get("gate", ""))
+            name = cls.aliases.get(raw_name.upper())
+            if name is None:
+                diagnostics.append({"index": index, "gate": raw_name, "level": "error", "message": "unsupported gate"})
+                continue
+            if "control_qubit" in gate_info or "target_qubit" in gate_info:
+                qubits = cls._as_list(gate_info.get("control_qubit")) + cls._as_list(gate_info.get("target_qubit"))
+            elif gate_info.get("qubits") not in (None, []):
+                qubits = cls._as_list(gate_info.get("qubits"))
+            elif "qubit" in gate_info:
+                qubits = cls._as_list(gate_info.get("qubit"))
+            else:
+                qubits = [0]
+            if not all(isinstance(q, int) and q >= 0 for q in qubits):
+                diagnostics.append({"index": index, "gate": name, "level": "error", "message": f"invalid qubits {qubits}"})
+                continue
+            try:
+                params = [value if isinstance(value, (int, float)) else cls.evaluate_angle(value, variables)
+                          for value in cls._as_list(gate_info.get("params", gate_info.get("angle")))]
+            except Exception as e:
+                diagnostics.append({"index": index, "gate": name, "level": "error", "message": f"{e}"})
+                continue
+            if name == "CCX" and len(qubits) == 2:
+                diagnostics.append({"index": index, "gate": name, "level": "warning", "message": "CCX with one control compiled as CX"})
+                name = "CX"
+            if name != "Measure":
+                arity, param_count, _ = cls.gate_table[name]
+                if len(qubits) != arity or len(set(qubits)) != arity:
+                    diagnostics.append({"index": index, "gate": name, "level": "error",
+                                        "message": f"expected {arity} distinct qubits, got {qubits}"})
+                    continue
+                if len(params) < param_count:
+                    diagnostics.append({"index": index, "gate": name, "level": "warning", "message": "missing angle, using 0"})
+                    params = params + [0.0] * (param_count - len(params))
+            if qubits and max(qubits) >= n:
+                diagnostics.append({"index": index, "gate": name, "level": "warning",
+                                    "message": f"qubit {max(qubits)} exceeds n={n}, circuit widened"})
+                n = max(qubits) + 1
+            gates.append({"gate": name, "qubits": qubits, "params": params})
+        return gates, n, diagnostics
+
+    @classmethod
+    def compile(cls, gates, n, diagnostics=None):
+        diagnostics = diagnostics if diagnostics is not None else []
+        qc = QuantumCircuit(n)
+        generator = QuantumCircuitGenerator()
+        generator.add_qubits(n)
+        measured = False
+        for gate_info in gates:
+            name, qubits, params = gate_info["gate"], gate_info["qubits"], gate_info.get("params", [])
+            if name == "Measure":
+                measured = True
+            else:
+                if measured:
+                    diagnostics.append({"index": None, "gate": name, "level": "warning",
+                                        "message": "gate after Measure; measurement is applied at the end"})
+                _, param_count, gate = cls.gate_table[name]
+                if gate is not None:
+                    qc.append(gate(*params[:param_count]) if param_count else gate, qubits, copy=False)
+                else:
+                    diagnostics.append({"index": None, "gate": name, "level": "warning",
+                                        "message": "Quirk-only gate shown in Quirk but not applied to the Qiskit circuit"})
+            generator.add_gate(name, qubits, params=params)
+        if measured:
+            qc.measure_all()
+        return qc, generator
+
+class QuantumCircuitGenerator:
+    supported_gates = SCHEMA_GATES
     def __init__(self):
         self.circuit = []
+        self._frontier = {}
+        self._exclusive_columns = set()
     def add_qubits(self, count):
         self.qubit_count = count
     def validate_gate(self, gate):
@@ -25,75 +255,42 @@ class QuantumCircuitGenerator:
             gate_dict["controls"] = controls
         if params:
             gate_dict["params"] = params
-        self.circuit.append([gate_dict])
+        self._schedule(gate_dict, all_indices)
+    def _schedule(self, gate_dict, qubits):
+        # Pack the gate into the leftmost column after the last gate on any of its qubits.
+        # Quirk applies a column's controls to every gate in it, so controlled gates get a column to themselves.
+        # A gate without qubits is ordered against everything, so it goes after the last column and acts as a barrier.
+        if "controls" in gate_dict or not qubits:
+            column = len(self.circuit)
+            self._exclusive_columns.add(column)
+        else:
+            column = max([0] + [self._frontier.get(q, 0) for q in qubits])
+            while column in self._exclusive_columns:
+                column += 1
+        if column == len(self.circuit):
+            self.circuit.append([])
+        self.circuit[column].append(gate_dict)
+        for q in (qubits or range(self.qubit_count)):
+            self._frontier[q] = column + 1
     def generate_json(self):
         return json.dumps({"cols": self.circuit}, indent=2)
     def generate_quirk_url(self):
         quirk_data = {"cols": self.circuit}
-        parsed_data = urllib.parse.quote(json.dumps(quirk_data))
+        parsed_data = urllib.parse.quote(json.dumps(quirk_data, separators=(",", ":")))
         return f"https://algassert.com/quirk#circuit={parsed_data}"
+    def generate_compact_payload(self):
+        return encode_quirk_payload(self.circuit)
     @staticmethod
-    def generate_circuit_from_json(input_data):
-        parameters = input_data.get("Parameters", [{}])[0]
-        n = parameters.get("n", 1)
-        qc = QuantumCircuit(n)
-        generator = QuantumCircuitGenerator()
-        generator.add_qubits(n)
-        for gate_info in input_data.get("gates", []):
-            gate = gate_info.get("gate")
-            qubits = gate_info.get("qubits", [])
-            if isinstance(qubits, int):
-                qubits = [qubits]
-            elif not qubits:
-                qubits = [gate_info.get("qubit", 0)]
-            params = gate_info.get("params", [])
-            if isinstance(params, (int, float)):
-                params = [params]
-            if gate in QuantumCircuitGenerator.supported_gates:
-                try:
-                    if gate == "H":
-                        qc.h(qubits[0])
-                    elif gate == "X":
-                        qc.x(qubits[0])
-                    elif gate == "Y":
-                        qc.y(qubits[0])
-                    elif gate == "Z":
-                        qc.z(qubits[0])
-                    elif gate == "S":
-                        qc.s(qubits[0])
-                    elif gate == "T":
-                        qc.t(qubits[0])
-                    elif gate == "CX":
-                        qc.cx(qubits[0], qubits[1])
-                    elif gate == "CCX":
-                        qc.ccx(qubits[0], qubits[1], qubits[2])
-                    elif gate == "SWAP":
-                        qc.swap(qubits[0], qubits[1])
-                    elif gate == "RX":
-                        angle = params[0] if params else 0
-                        qc.rx(angle, qubits[0])
-                    elif gate == "RY":
-                        angle = params[0] if params else 0
-                        qc.ry(angle, qubits[0])
-                    elif gate == "RZ":
-                        angle = params[0] if params else 0
-                        qc.rz(angle, qubits[0])
-                    elif gate == "Ryft":
-                        pass
-                    elif gate == "ZDetector":
-                        pass
-                    elif gate == "YDetector":
-                        pass
-                    elif gate == "ZDetectControlReset":
-                        pass
-                    elif gate == "Measure":
-                        qc.measure_all()
-                    generator.add_gate(gate, qubits, params=params)
-                except IndexError as e:
-                    print(f"Warning: Missing parameters for gate {gate}: {e}")
-                    continue
-        quirk_url = generator.generate_quirk_url()
-        return qc, quirk_url
+    def generate_circuit_from_json(input_data, peephole=True):
+        qc, generator, _ = QuantumCircuitGenerator.build_from_json(input_data, peephole=peephole)
+        return qc, generator.generate_quirk_url()
+    @staticmethod
+    def build_from_json(input_data, peephole=True):
+        gates, n, diagnostics = GateJsonCompiler.normalize(input_data)
+        if peephole:
+            gates, _ = GatePeepholeOptimizer.optimize(gates)
+        qc, generator = GateJsonCompiler.compile(gates, n, diagnostics)
+        return qc, generator, diagnostics
 
 
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+import hashlib
+from types import MappingProxyType
+from typing import Any, Dict, Union
+import cirq
+from qiskit import ClassicalRegister, QuantumCircuit
+from qiskit.circuit import Clbit, IfElseOp, SwitchCaseOp, WhileLoopOp
+from services.gate_registry import GATE_REGISTRY
+
+QISKIT_CLIFFORD_GATES = frozenset(spec.qiskit_name for spec in GATE_REGISTRY.values() if spec.clifford and spec.qiskit_name)
+NON_UNITARY_OPERATIONS = frozenset({'measure', 'reset', 'barrier', 'delay', 'save_statevector'})
+
+def parse_circuit(circuit_input: Union[cirq.Circuit, QuantumCircuit, str], backend_type: str) -> Union[cirq.Circuit, QuantumCircuit]:
+    backend_type = backend_type.lower()
+    if backend_type not in ['cirq', 'qiskit']:
+        raise ValueError("Backend must be 'cirq' or 'qiskit'")
+    if isinstance(circuit_input, str):
+        # Malformed circuit text is the caller's mistake, so it surfaces as ValueError like a bad backend
+        try:
+            if backend_type == 'cirq':
+                return cirq.read_json(json_text=circuit_input)
+            return QuantumCircuit.from_qasm_str(circuit_input)
+        except Exception as e:
+            raise ValueError(f"Invalid {backend_type} circuit: {e}") from e
+    return circuit_input
+
+def _format_param(param: Any) -> str:
+    try:
+        return format(float(param), '.12g')
+    except (TypeError, ValueError):
+        return str(param)
+
+def _qiskit_classical(circuit: QuantumCircuit, target: Any) -> str:
+    if isinstance(target, ClassicalRegister):
+        return target.name
+    if isinstance(target, Clbit):
+        return f"c{circuit.find_bit(target).index}"
+    return str(target)  # classical expression
+
+def _qiskit_condition(circuit: QuantumCircuit, condition: Any) -> str:
+    if condition is None:
+        return ""
+    if isinstance(condition, tuple):
+        target, value = condition
+        return f"?{_qiskit_classical(circuit, target)}=={value}"
+    return f"?{_qiskit_classical(circuit, condition)}"
+
+def _qiskit_token(circuit: QuantumCircuit, instr) -> str:
+    """Hash token for one instruction: name, params, qubit and clbit indices, condition and nested blocks."""
+    operation = instr.operation
+    params = ",".join(_format_param(p) for p in operation.params if not isinstance(p, QuantumCircuit))
+    qubits = [circuit.find_bit(q).index for q in instr.qubits]
+    clbits = [circuit.find_bit(c).index for c in instr.clbits]
+    token = f";{operation.name}({params}){qubits}{clbits}"
+    # Control flow exposes its condition; legacy c_if conditions sit behind a deprecated property
+    condition = operation.condition if isinstance(operation, (IfElseOp, WhileLoopOp)) else getattr(operation, "_condition", None)
+    token += _qiskit_condition(circuit, condition)
+    if isinstance(operation, SwitchCaseOp):
+        token += f"?{_qiskit_classical(circuit, operation.target)}"
+        for values, block in operation.cases_specifier():
+            token += f"case{values}{{" + "".join(_qiskit_token(block, inner) for inner in block.data) + "}"
+        return token
+    for block in getattr(operation, "blocks", ()):
+        token += "{" + "".join(_qiskit_token(block, inner) for inner in block.data) + "}"
+    return token
+
+class CircuitSummary:
+    """Immutable statistics of a circuit, gathered in a single walk over its operations.
+
+    Shared by the mitigator, the transpiler and the `/circuit-summary` endpoint so that
+    gate counts, the Clifford split and the circuit fingerprint are only computed once.
+    """
+
+    __slots__ = (
+        "backend_type", "num_qubits", "gate_counts", "clifford_count", "non_clifford_count",
+        "depth", "two_qubit_count", "fingerprint"
+    )
+
+    def __init__(self, backend_type: str, num_qubits: int, gate_counts: Dict[str, int], clifford_count: int,
+                 non_clifford_count: int, depth: int, two_qubit_count: int, fingerprint: str):
+        object.__setattr__(self, "backend_type", backend_type)
+        object.__setattr__(self, "num_qubits", num_qubits)
+        object.__setattr__(self, "gate_counts", MappingProxyType(dict(gate_counts)))
+        object.__setattr__(self, "clifford_count", clifford_count)
+        object.__setattr__(self, "non_clifford_count", non_clifford_count)
+        object.__setattr__(self, "depth", depth)
+        object.__setattr__(self, "two_qubit_count", two_qubit_count)
+        object.__setattr__(self, "fingerprint", fingerprint)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("CircuitSummary is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("CircuitSummary is immutable")
+
+    def __repr__(self) -> str:
+        return (f"CircuitSummary(backend_type={self.backend_type!r}, num_qubits={self.num_qubits}, "
+                f"total_gates={self.total_gates}, depth={self.depth}, fingerprint={self.fingerprint!r})")
+
+    @property
+    def total_gates(self) -> int:
+        return self.clifford_count + self.non_clifford_count
+
+    @classmethod
+    def from_circuit(cls, circuit: Union[cirq.Circuit, QuantumCircuit]) -> "CircuitSummary":
+        if isinstance(circuit, QuantumCircuit):
+            return cls._from_qiskit(circuit)
+        if isinstance(circuit, cirq.Circuit):
+            return cls._from_cirq(circuit)
+        raise ValueError(f"Unsupported circuit type: {type(circuit)}")
+
+    @classmethod
+    def _from_qiskit(cls, circuit: QuantumCircuit) -> "CircuitSummary":
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"qiskit|{circuit.num_qubits}|{circuit.num_clbits}".encode())
+        gate_counts: Dict[str, int] = {}
+        levels: Dict[Any, int] = {}
+        clifford_count = non_clifford_count = two_qubit_count = depth = 0
+        for instr in circuit.data:
+            operation = instr.operation
+            name = operation.name
+            gate_counts[name] = gate_counts.get(name, 0) + 1
+            qubits = instr.qubits
+            hasher.update(_qiskit_token(circuit, instr).encode())
+            if getattr(operation, '_directive', False):
+                continue
+            wires = list(instr.qubits) + list(instr.clbits)
+            level = max((levels.get(w, 0) for w in wires), default=0) + 1
+            for w in wires:
+                levels[w] = level
+            depth = max(depth, level)
+            if name in NON_UNITARY_OPERATIONS:
+                continue
+            if name in QISKIT_CLIFFORD_GATES:
+                clifford_count += 1
+            else:
+                non_clifford_count += 1
+            if len(qubits) == 2:
+                two_qubit_count += 1
+        return cls('qiskit', circuit.num_qubits, gate_counts, clifford_count, non_clifford_count,
+                   depth, two_qubit_count, hasher.hexdigest())
+
+    @classmethod
+    def _from_cirq(cls, circuit: cirq.Circuit) -> "CircuitSummary":
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(b"cirq")
+        gate_counts: Dict[str, int] = {}
+        qubits_seen = set()
+        clifford_count = non_clifford_count = two_qubit_count = depth = 0
+        for moment in circuit:
+            if not moment.operations:
+                continue
+            depth += 1
+            hasher.update(b"|")
+            for op in moment.operations:
+                gate = getattr(op, 'gate', None)
+                qubits_seen.update(op.qubits)
+                if cirq.is_measurement(op):
+                    name = 'measure'
+                else:
+                    name = str(gate if gate is not None else op).split('(')[0].lower()
+                gate_counts[name] = gate_counts.get(name, 0) + 1
+                # Classically controlled and nested operations have no gate, so hash the whole operation
+                hasher.update(f";{gate if gate is not None else op!r}{[str(q) for q in op.qubits]}".encode())
+                if name == 'measure' or gate is None:
+                    continue
+                if cirq.has_stabilizer_effect(op):
+                    clifford_count += 1
+                else:
+                    non_clifford_count += 1
+                if len(op.qubits) == 2:
+                    two_qubit_count += 1
+        return cls('cirq', len(qubits_seen), gate_counts, clifford_count, non_clifford_count,
+                   depth, two_qubit_count, hasher.hexdigest())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "backend_type": self.backend_type,
+            "num_qubits": self.num_qubits,
+            "gate_counts": dict(self.gate_counts),
+            "clifford_count": self.clifford_count,
+            "non_clifford_count": self.non_clifford_count,
+            "total_gates": self.total_gates,
+            "depth": self.depth,
+            "two_qubit_count": self.two_qubit_count,
+            "fingerprint": self.fingerprint
+        }
@@ -0,0 +1,107 @@
+import math
+from typing import Any, Dict, NamedTuple, Optional
+import cirq
+from qiskit.circuit.library import (
+    CCXGate, CXGate, CYGate, CZGate, GlobalPhaseGate, HGate, IGate, QFT, RXGate, RYGate, RZGate,
+    SdgGate, SGate, SwapGate, SXdgGate, SXGate, TdgGate, TGate, XGate, YGate, ZGate
+)
+
+class GateSpec(NamedTuple):
+    name: str
+    arity: int
+    param_count: int = 0
+    clifford: bool = False
+    qiskit: Any = None  # prebuilt gate, or the gate class when param_count > 0
+    cirq: Any = None  # cirq gate, or a factory taking the angles when param_count > 0
+    quirk_id: Optional[str] = None
+    qiskit_name: Optional[str] = None
+    schema: bool = False  # accepted in the LLM gate JSON
+
+# Quirk toolbox ids offered to the LLM, in palette order
+QUIRK_PALETTE = tuple(dict.fromkeys([
+    "Measure", "|0⟩⟨0|", "|1⟩⟨1|", "•", "◦", "Density", "Density3", "Bloch", "Chance", "Amps2", "Z", "Y", "X", "inputA4",
+    "Z^-½", "Z^½", "X^½", "Y^½", "Y^-½", "X^-½", "Z^¼", "Y^¼", "X^¼", "Z^-¼", "Y^-¼", "X^-¼",
+    "Z^t", "Y^t", "X^t", "Z^-t", "Y^-t", "X^-t", "Z^ft", "Y^ft", "X^ft", "Rzft", "Ryft", "Rxft",
+    "Z^(A/2^n)", "inputA2", "Z^(-A/2^n)", "Ryft", "X^ft", "ZDetector", "YDetector", "ZDetectControlReset",
+    "YDetectControlReset", "XDetector", "XDetectControlReset", "zpar", "xpar", "ypar", "⊕", "⊗", "⊖",
+    "|+⟩⟨+|", "|-⟩⟨-|", "|/⟩⟨/|", "|X⟩⟨X|", "QFT2", "QFT3", "QFT†2", "QFT†3", "PhaseGradient3", "grad^-t2",
+    "inputA3", "inputB2", "inputB3", "inputR2", "inputR3", "setR", "setB", "setA", "inc2", "inc3", "+=A2", "+=AB2",
+    "^A!=B", "-=AB2", "^A>=B", "^A=B", "*A2", "/A2", "-=A2", "^A>B", "^A<B", "incmodR2", "decmodR2", "+AmodR2",
+    "*BToAmodR2", "…", "0", "NeGate", "-i", "i", "√-i", "√i"
+]))
+
+_SPECS = [
+    # Gates of the LLM JSON schema; single-row entries come first so they own their Quirk id
+    GateSpec("H", 1, 0, True, HGate(), cirq.H, "H", "h", True),
+    GateSpec("X", 1, 0, True, XGate(), cirq.X, "X", "x", True),
+    GateSpec("Y", 1, 0, True, YGate(), cirq.Y, "Y", "y", True),
+    GateSpec("Z", 1, 0, True, ZGate(), cirq.Z, "Z", "z", True),
+    GateSpec("S", 1, 0, True, SGate(), cirq.S, "Z^½", "s", True),
+    GateSpec("T", 1, 0, False, TGate(), cirq.T, "Z^¼", "t", True),
+    GateSpec("RX", 1, 1, False, RXGate, cirq.rx, "Rxft", "rx", True),
+    GateSpec("RY", 1, 1, False, RYGate, cirq.ry, "Ryft", "ry", True),
+    GateSpec("RZ", 1, 1, False, RZGate, cirq.rz, "Rzft", "rz", True),
+    GateSpec("CX", 2, 0, True, CXGate(), cirq.CNOT, "X", "cx", True),
+    GateSpec("CCX", 3, 0, False, CCXGate(), cirq.CCX, "X", "ccx", True),
+    GateSpec("SWAP", 2, 0, True, SwapGate(), cirq.SWAP, "Swap", "swap", True),
+    GateSpec("Measure", 1, 0, False, None, None, "Measure", "measure", True),
+    GateSpec("InputA", 1, schema=True, quirk_id="inputA1"),
+    GateSpec("InputB", 1, schema=True, quirk_id="inputB1"),
+    GateSpec("InputC", 1, schema=True),
+    GateSpec("Ryft", 1, schema=True, quirk_id="Ryft"),
+    GateSpec("ZDetector", 1, schema=True, quirk_id="ZDetector"),
+    GateSpec("YDetector", 1, schema=True, quirk_id="YDetector"),
+    GateSpec("ZDetectControlReset", 1, schema=True, quirk_id="ZDetectControlReset"),
+    # Further Qiskit gates the converters and transpilers understand
+    GateSpec("ID", 1, 0, True, IGate(), cirq.I, None, "id"),
+    GateSpec("SDG", 1, 0, True, SdgGate(), cirq.S**-1, "Z^-½", "sdg"),
+    GateSpec("TDG", 1, 0, False, TdgGate(), cirq.T**-1, "Z^-¼", "tdg"),
+    GateSpec("SX", 1, 0, True, SXGate(), cirq.X**0.5, "X^½", "sx"),
+    GateSpec("SXDG", 1, 0, True, SXdgGate(), cirq.X**-0.5, "X^-½", "sxdg"),
+    GateSpec("CY", 2, 0, True, CYGate(), cirq.ControlledGate(cirq.Y), "Y", "cy"),
+    GateSpec("CZ", 2, 0, True, CZGate(), cirq.CZ, "Z", "cz"),
+    # Quirk palette gates with an exact Qiskit equivalent
+    GateSpec("X^¼", 1, 0, False, XGate().power(0.25), cirq.X**0.25, "X^¼"),
+    GateSpec("X^-¼", 1, 0, False, XGate().power(-0.25), cirq.X**-0.25, "X^-¼"),
+    GateSpec("Y^½", 1, 0, True, YGate().power(0.5), cirq.Y**0.5, "Y^½"),
+    GateSpec("Y^-½", 1, 0, True, YGate().power(-0.5), cirq.Y**-0.5, "Y^-½"),
+    GateSpec("Y^¼", 1, 0, False, YGate().power(0.25), cirq.Y**0.25, "Y^¼"),
+    GateSpec("Y^-¼", 1, 0, False, YGate().power(-0.25), cirq.Y**-0.25, "Y^-¼"),
+    GateSpec("QFT2", 2, 0, False, QFT(2).to_gate(), None, "QFT2"),
+    GateSpec("QFT3", 3, 0, False, QFT(3).to_gate(), None, "QFT3"),
+    GateSpec("QFT†2", 2, 0, False, QFT(2, inverse=True).to_gate(), None, "QFT†2"),
+    GateSpec("QFT†3", 3, 0, False, QFT(3, inverse=True).to_gate(), None, "QFT†3"),
+    # Phase gates touch no row of their own; under controls they become relative phases
+    GateSpec("NeGate", 0, 0, True, GlobalPhaseGate(math.pi), None, "NeGate"),
+    GateSpec("i", 0, 0, True, GlobalPhaseGate(math.pi / 2), None, "i"),
+    GateSpec("-i", 0, 0, True, GlobalPhaseGate(-math.pi / 2), None, "-i"),
+    GateSpec("√i", 0, 0, False, GlobalPhaseGate(math.pi / 4), None, "√i"),
+    GateSpec("√-i", 0, 0, False, GlobalPhaseGate(-math.pi / 4), None, "√-i"),
+]
+
+GATE_REGISTRY: Dict[str, GateSpec] = {}
+QUIRK_GATES_BY_ID: Dict[str, GateSpec] = {}
+QISKIT_GATES_BY_NAME: Dict[str, GateSpec] = {}
+
+def _register(spec: GateSpec) -> None:
+    GATE_REGISTRY[spec.name] = spec
+    if spec.quirk_id:
+        QUIRK_GATES_BY_ID.setdefault(spec.quirk_id, spec)
+    if spec.qiskit_name:
+        QISKIT_GATES_BY_NAME[spec.qiskit_name] = spec
+
+for _spec in _SPECS:
+    _register(_spec)
+# The rest of the palette is Quirk-only: displays, controls, arithmetic and time-dependent gates
+for _quirk_id in QUIRK_PALETTE:
+    if _quirk_id not in QUIRK_GATES_BY_ID:
+        _arity = int(_quirk_id[-1]) if len(_quirk_id) > 1 and _quirk_id[-1].isdigit() else 1
+        _register(GateSpec(_quirk_id, _arity, quirk_id=_quirk_id))
+
+SCHEMA_GATES = frozenset(spec.name for spec in GATE_REGISTRY.values() if spec.schema)
+QUIRK_PALETTE_IDS = frozenset(QUIRK_PALETTE)
+_GATES_BY_UPPER_NAME = {name.upper(): spec for name, spec in GATE_REGISTRY.items()}
+
+def get_gate(name: str) -> Optional[GateSpec]:
+    """Case-insensitive O(1) lookup by registry name."""
+    return GATE_REGISTRY.get(name) or _GATES_BY_UPPER_NAME.get(name.upper())
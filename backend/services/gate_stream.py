@@ -0,0 +1,117 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+import json5
+
+GATES_KEY = re.compile(r'"gates"\s*:\s*\[')
+PARAMETERS_KEY = re.compile(r'"Parameters"\s*:\s*(\[.*?\])\s*,', re.DOTALL)
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return json5.loads(text)
+
+class IncrementalGateParser:
+    """Pulls gate objects out of a streamed LLM completion as soon as each one closes.
+
+    ``feed`` scans only the new characters: it waits for the ``"gates": [`` key, then tracks
+    string/escape state and bracket depth inside the array, and parses each top-level object
+    the moment its closing brace arrives. ``Parameters`` are read from the text before the
+    gates array so angle expressions can be evaluated while the rest is still generating.
+    Chunks are kept in a list and only the unfinished gate is buffered, so long completions
+    stay linear.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._buffer = ""
+        self.parameters: Optional[List[Dict[str, Any]]] = None
+        self.errors: List[str] = []
+        self.count = 0
+        self._position = 0
+        self._in_gates = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = None
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._chunks.append(chunk)
+        self._buffer += chunk
+        gates = []
+        text = self._buffer
+        while self._position < len(text) and not self._done:
+            if not self._in_gates:
+                match = GATES_KEY.search(text, self._position)
+                if match is None:
+                    # Keep a short tail so a key split across chunks is still found
+                    self._position = max(self._position, len(text) - 16)
+                    break
+                self._read_parameters(text[:match.start()])
+                self._in_gates = True
+                self._position = match.end()
+                continue
+            char = text[self._position]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0 and char == "{":
+                    self._object_start = self._position
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    self._done = char == "]"
+                else:
+                    self._depth -= 1
+                    if self._depth == 0 and char == "}" and self._object_start is not None:
+                        gate = self._parse_gate(text[self._object_start:self._position + 1])
+                        if gate is not None:
+                            gates.append(gate)
+                        self._object_start = None
+            self._position += 1
+        if self._in_gates:
+            # Scanned text is never read again except for the gate still being generated
+            keep = self._object_start if self._object_start is not None else self._position
+            self._buffer = text[keep:]
+            self._position -= keep
+            if self._object_start is not None:
+                self._object_start = 0
+        return gates
+
+    def _read_parameters(self, prefix: str) -> None:
+        match = PARAMETERS_KEY.search(prefix)
+        if match:
+            try:
+                self.parameters = _loads(match.group(1))
+            except ValueError:
+                self.parameters = None
+
+    def _parse_gate(self, fragment: str) -> Optional[Dict[str, Any]]:
+        index = self.count
+        self.count += 1
+        try:
+            gate = _loads(fragment)
+        except ValueError as e:
+            self.errors.append(f"gate {index}: {e}")
+            return None
+        return gate if isinstance(gate, dict) else None
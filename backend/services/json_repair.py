@@ -0,0 +1,189 @@
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json5
+import orjson
+
+CLOSERS = {"{": "}", "[": "]"}
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+JSON_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+# A number cut off by truncation, e.g. "1.", "2e-" or a lone "-", at the very end of the text
+TRAILING_NUMBER = re.compile(r"(?<![\w.])-?[\d.][-+\d.eE]*$|(?<![\w.])-$")
+
+def _opens_string(text: str, i: int) -> bool:
+    # An apostrophe inside a word ("it's") is prose, not a single-quoted string
+    return text[i] == '"' or (text[i] == "'" and (i == 0 or not text[i - 1].isalnum()))
+
+def _scan(text: str, start: int) -> Tuple[Optional[int], List[str]]:
+    """Walk one bracketed value from text[start]; return (end, []) when it closes or (None, open stack) if truncated."""
+    stack: List[str] = []
+    quote = None
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == quote:
+                quote = None
+        elif _opens_string(text, i):
+            quote = char
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+        elif char in "}]" and stack and stack[-1] == char:
+            stack.pop()
+            if not stack:
+                return i + 1, []
+    return None, stack
+
+def iter_json_candidates(text: str) -> Iterator[Tuple[str, bool]]:
+    """Yield (fragment, complete) for every balanced top-level object, then any truncated trailing one."""
+    position = text.find("{")
+    while position != -1:
+        end, _ = _scan(text, position)
+        if end is None:
+            yield text[position:], False
+            return
+        yield text[position:end], True
+        position = text.find("{", end)
+
+def repair_json(fragment: str) -> str:
+    """Single-pass rewrite of common LLM defects into strict JSON.
+
+    Handles trailing commas, unquoted keys, single-quoted strings, Python literals and
+    truncation (unterminated string, dangling key or comma, unclosed brackets).
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    quote = None
+    escape = False
+    last = ""  # last significant character emitted outside strings
+    string_is_key = pending_key = False
+    i, length = 0, len(fragment)
+    while i < length:
+        char = fragment[i]
+        if quote:
+            if escape:
+                escape = False
+                if quote == "'" and char == "'":
+                    out[-1] = "'"
+                else:
+                    out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char == quote:
+                quote = None
+                out.append('"')
+                last = '"'
+                pending_key = string_is_key
+            elif char == '"':
+                out.append('\\"')
+            else:
+                out.append(CONTROL_ESCAPES.get(char, char))
+            i += 1
+            continue
+        if _opens_string(fragment, i):
+            quote = char
+            string_is_key = bool(stack) and stack[-1] == "}" and last in ("{", ",")
+            out.append('"')
+        elif char in CLOSERS:
+            stack.append(CLOSERS[char])
+            out.append(char)
+            last = char
+        elif char in "}]":
+            while out and out[-1].isspace():
+                out.pop()
+            if last == ",":
+                out.pop()
+            if stack and stack[-1] == char:
+                stack.pop()
+            out.append(char)
+            last = char
+        elif char.isalpha() or char == "_":
+            j = i
+            while j < length and (fragment[j].isalnum() or fragment[j] == "_"):
+                j += 1
+            word = fragment[i:j]
+            k = j
+            while k < length and fragment[k].isspace():
+                k += 1
+            if stack and stack[-1] == "}" and last in ("{", ",") and k < length and fragment[k] == ":":
+                out.append(f'"{word}"')
+                last = '"'
+            else:
+                out.append(PYTHON_LITERALS.get(word, word))
+                last = "w"
+            i = j
+            continue
+        elif not char.isspace():
+            out.append(char)
+            last = char
+            pending_key = pending_key and char != ":"
+        else:
+            out.append(char)
+        i += 1
+    # Close whatever the completion cut off
+    if quote:
+        if escape:
+            out.pop()
+        out.append('"')
+        last = '"'
+        pending_key = string_is_key
+    while out and out[-1].isspace():
+        out.pop()
+    text = "".join(out)
+    partial = TRAILING_NUMBER.search(text)
+    if partial and not JSON_NUMBER.fullmatch(partial.group()):
+        # Keep the longest valid prefix ("1." -> "1"); a value with no digits is dropped
+        complete = JSON_NUMBER.match(partial.group())
+        text = (text[:partial.start()] + (complete.group() if complete else "")).rstrip()
+        out = list(text)
+        last = text[-1] if text else ""
+    if pending_key and last == '"':
+        out.append(":null")
+    elif last == ",":
+        out.pop()
+    elif last == ":":
+        out.append("null")
+    while stack:
+        out.append(stack.pop())
+    return "".join(out)
+
+def parse_llm_json(content: str) -> Dict[str, Any]:
+    """Extract the response object from LLM output.
+
+    Strict orjson first on the whole text, then on each balanced candidate, then on its repaired
+    form, with json5 only as the last resort. Among several objects the first one with a
+    ``gates`` key wins, otherwise the largest.
+    """
+    try:
+        parsed = orjson.loads(content)
+        if isinstance(parsed, dict):
+            return parsed
+    except orjson.JSONDecodeError:
+        pass
+    best: Optional[Dict[str, Any]] = None
+    for fragment, complete in iter_json_candidates(content):
+        parsed = None
+        attempts = (orjson.loads, lambda text: orjson.loads(repair_json(text)), json5.loads)
+        for attempt in attempts if complete else attempts[1:]:
+            try:
+                parsed = attempt(fragment)
+                break
+            except ValueError:
+                continue
+        if not isinstance(parsed, dict):
+            continue
+        if "gates" in parsed:
+            return parsed
+        if best is None or len(parsed) > len(best):
+            best = parsed
+    if best is None and '\\"' in content:
+        # Whole response JSON-escaped once more, e.g. {\"gates\": ...}
+        return parse_llm_json(content.replace('\\"', '"'))
+    if best is None:
+        raise ValueError("No JSON structure found")
+    return best
@@ -1,24 +1,27 @@
 #Sample Code this code  have not been included in production
 import os
 import json
+from typing import Optional
 from fastapi.exceptions import HTTPException
-from groq import Groq
+from groq import AsyncGroq
 from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
+from services.llm_backends import LLMBackend
 from services.prompt_manager import QuantumPrompt
 from services.util import extract_json_from_content
 from dotenv import load_dotenv
 
 load_dotenv()
 
-api_key = os.environ["GROQ_API_KEY"]
+api_key = os.environ.get("GROQ_API_KEY")
 
 class QuantmLLM:
-    def  __init__(self):
-        self.quantum = Groq(api_key=api_key)
-        pass
+    # Async like every LLMBackend; returns the completion text whichever path answered
+    def  __init__(self, backend: Optional[LLMBackend] = None):
+        self.backend = backend
+        self.quantum = AsyncGroq(api_key=api_key) if backend is None else None
 
-    def llm_request(self):
+    async def llm_request(self) -> str:
         messages=[
         {
             "role": "system",
@@ -45,7 +48,10 @@ class QuantmLLM:
              """,
          }
         ]
-        responses = self.quantum.chat.completions.create(
+        if self.backend is not None:
+            completion = await self.backend.generate("Provide a circuit for generating random numbers", messages, model="llama3-8b-8192", temperature=0.5, max_tokens=1024)
+            return completion.content
+        responses = await self.quantum.chat.completions.create(
             messages=messages,
             model="llama3-8b-8192",
             temperature=0.5,
@@ -53,21 +59,24 @@ class QuantmLLM:
             top_p=1,
             stop=None,
         )
-        return responses
+        return responses.choices[0].message.content
     
 class QuantumLLM:
-    def __init__(self):
-        self.quantum = ChatGroq(api_key=api_key)
+    def __init__(self, backend: Optional[LLMBackend] = None):
+        self.backend = backend
+        self.quantum = ChatGroq(api_key=api_key) if backend is None else None
 
-    def llm_request(self,statements : str) -> object:
+    async def llm_request(self,statements : str) -> object:
         try:
           user_input = QuantumPrompt.get_prompt(statement=statements)
           messages = [
              SystemMessage(content="you are a helpful assistant providing answers only in a strucutred Valid json format."),
              HumanMessage(content=user_input)
           ]
-          response = self.quantum.invoke(messages, model="llama3-8b-8192", temperature=0.5, max_tokens=3000, top_p=1)
-          content_str = response.content 
+          if self.backend is not None:
+              content_str = (await self.backend.generate(statements, messages, model="llama3-8b-8192", temperature=0.5, max_tokens=3000, top_p=1)).content
+          else:
+              content_str = (await self.quantum.ainvoke(messages, model="llama3-8b-8192", temperature=0.5, max_tokens=3000, top_p=1)).content
           print(content_str)
           try:
                 content = extract_json_from_content(content_str)
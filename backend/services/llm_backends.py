@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, NamedTuple, Optional
+from services.llm_cache import normalize_statement
+
+LLM_REPLAY_PATH = os.environ.get("DEQCODE_LLM_REPLAY_PATH", os.environ.get("DEQCODE_LLM_CAPTURE_PATH", "llm_responses.jsonl"))
+LLM_LATENCY = float(os.environ.get("DEQCODE_LLM_LATENCY", "0"))
+LLM_LATENCY_JITTER = float(os.environ.get("DEQCODE_LLM_LATENCY_JITTER", "0"))
+STREAM_CHUNK_CHARS = 16
+
+class Completion(NamedTuple):
+    # The whole completion from generate, or one piece of it from stream
+    content: str
+    # Token usage as reported by the provider; None when the backend cannot tell
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+class LLMBackend(ABC):
+    """What QuantumLLM needs from a model: a completion, optionally streamed, for one statement.
+
+    ``statement`` is the user's request and ``messages`` the compiled chat prompt; live models read
+    the messages, offline ones key on the statement. ``stream`` yields Completion pieces, and token
+    usage, when the provider reports it, arrives on whichever piece carries it.
+    """
+    name = "base"
+
+    @abstractmethod
+    async def generate(self, statement: str, messages: list, **params) -> Completion:
+        """Return the whole completion for the statement."""
+        pass
+
+    async def stream(self, statement: str, messages: list, **params) -> AsyncIterator[Completion]:
+        yield await self.generate(statement, messages, **params)
+
+    async def aclose(self):
+        pass
+
+class GroqBackend(LLMBackend):
+    """Live Groq completions through a long-lived ChatGroq client."""
+    name = "groq"
+
+    def __init__(self, client):
+        self.client = client
+
+    async def generate(self, statement: str, messages: list, **params) -> Completion:
+        response = await self.client.ainvoke(messages, **params)
+        usage = getattr(response, "usage_metadata", None) or {}
+        return Completion(response.content, usage.get("input_tokens"), usage.get("output_tokens"))
+
+    async def stream(self, statement: str, messages: list, **params) -> AsyncIterator[Completion]:
+        async for chunk in self.client.astream(messages, **params):
+            usage = getattr(chunk, "usage_metadata", None) or {}
+            if chunk.content or usage:
+                yield Completion(chunk.content, usage.get("input_tokens"), usage.get("output_tokens"))
+
+    async def aclose(self):
+        if self.client.http_async_client is not None:
+            await self.client.http_async_client.aclose()
+        if self.client.http_client is not None:
+            self.client.http_client.close()
+
+class SimulatedLatency:
+    """Delay before the first token plus an optional uniform jitter, both in seconds."""
+
+    def __init__(self, latency: float = LLM_LATENCY, jitter: float = LLM_LATENCY_JITTER, chars_per_second: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.chars_per_second = chars_per_second
+
+    async def first_token(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def chunks(self, content: str) -> AsyncIterator[str]:
+        await self.first_token()
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            if self.chars_per_second > 0:
+                await asyncio.sleep(STREAM_CHUNK_CHARS / self.chars_per_second)
+            yield content[start:start + STREAM_CHUNK_CHARS]
+
+class StubBackend(LLMBackend):
+    """Deterministic offline model: the same statement always yields the same valid circuit JSON.
+
+    The qubit count is taken from "<n> qubit(s)" in the statement, otherwise derived from its hash,
+    and the circuit is a Hadamard layer, a CX chain, one parameterised RY and a measurement per qubit.
+    """
+    name = "stub"
+    QUBIT_PATTERN = re.compile(r"(\d+)\s*-?\s*qubits?")
+
+    def __init__(self, latency: Optional[SimulatedLatency] = None, max_qubits: int = 8):
+        self.latency = latency or SimulatedLatency()
+        self.max_qubits = max_qubits
+
+    def respond(self, statement: str) -> str:
+        statement = normalize_statement(statement)
+        digest = hashlib.blake2b(statement.encode("utf-8"), digest_size=8).digest()
+        match = self.QUBIT_PATTERN.search(statement)
+        n = min(int(match.group(1)), self.max_qubits) if match else 2 + digest[0] % 3
+        n = max(n, 1)
+        theta = round((digest[1] / 255) * 3.1416, 4)
+        target = digest[2] % n
+        gates = [{"gate": "H", "qubit": q} for q in range(n)]
+        gates += [{"gate": "CX", "control_qubit": q, "target_qubit": q + 1} for q in range(n - 1)]
+        gates.append({"gate": "RY", "qubit": target, "angle": "theta"})
+        gates += [{"gate": "Measure", "qubit": q} for q in range(n)]
+        code = ["from qiskit import QuantumCircuit\n", f"qc = QuantumCircuit({n})\n"]
+        code += [f"qc.h({q})\n" for q in range(n)]
+        code += [f"qc.cx({q}, {q + 1})\n" for q in range(n - 1)]
+        code += [f"qc.ry({theta}, {target})\n", "qc.measure_all()\n"]
+        return json.dumps({
+            "Parameters": [{"n": n, "theta": theta}],
+            "gates": gates,
+            "code": code,
+            "explanation": f"Stub circuit for: {statement}"
+        })
+
+    async def generate(self, statement: str, messages: list, **params) -> Completion:
+        await self.latency.first_token()
+        return Completion(self.respond(statement))
+
+    async def stream(self, statement: str, messages: list, **params) -> AsyncIterator[Completion]:
+        async for chunk in self.latency.chunks(self.respond(statement)):
+            yield Completion(chunk)
+
+class RecordReplayBackend(LLMBackend):
+    """Serves captured completions from a JSONL file of {"statement", "content"} lines.
+
+    Statements are matched after normalize_statement. A miss goes to ``fallback`` (a stub for
+    offline runs, the live backend when recording); with ``record=True`` its answer is appended to
+    the file so the next run replays it. Without a fallback a miss raises KeyError.
+    """
+    name = "replay"
+
+    def __init__(self, path: str = LLM_REPLAY_PATH, latency: Optional[SimulatedLatency] = None,
+                 fallback: Optional[LLMBackend] = None, record: bool = False):
+        self.path = path
+        self.latency = latency or SimulatedLatency()
+        self.fallback = fallback
+        self.record = record
+        self.responses: Dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self) -> "RecordReplayBackend":
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                        self.responses[normalize_statement(entry["statement"])] = entry["content"]
+                    except (ValueError, KeyError):
+                        continue
+        print(f"Replay backend: {len(self.responses)} recorded responses from {self.path}")
+        return self
+
+    async def _miss(self, statement: str, messages: list, **params) -> Completion:
+        self.misses += 1
+        if self.fallback is None:
+            raise KeyError(f"No recorded response for statement: {statement}")
+        completion = await self.fallback.generate(statement, messages, **params)
+        if self.record:
+            self.responses[normalize_statement(statement)] = completion.content
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"statement": statement, "content": completion.content}) + "\n")
+        return completion
+
+    async def generate(self, statement: str, messages: list, **params) -> Completion:
+        content = self.responses.get(normalize_statement(statement))
+        if content is None:
+            return await self._miss(statement, messages, **params)
+        self.hits += 1
+        await self.latency.first_token()
+        return Completion(content)
+
+    async def stream(self, statement: str, messages: list, **params) -> AsyncIterator[Completion]:
+        content = self.responses.get(normalize_statement(statement))
+        if content is None:
+            yield await self._miss(statement, messages, **params)
+            return
+        self.hits += 1
+        async for chunk in self.latency.chunks(content):
+            yield Completion(chunk)
+
+    async def aclose(self):
+        if self.fallback is not None:
+            await self.fallback.aclose()
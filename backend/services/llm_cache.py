@@ -0,0 +1,84 @@
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+LLM_CACHE_DIR = os.environ.get("DEQCODE_LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_TTL = float(os.environ.get("DEQCODE_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+def normalize_statement(statement: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation so trivially different retries share a key."""
+    return re.sub(r"\s+", " ", statement).strip().lower().rstrip(".!?")
+
+class LLMResponseCache:
+    """Exact-match cache of parsed LLM responses: an in-memory LRU backed by JSON files on disk.
+
+    Keys cover the normalized statement and every setting that shapes the completion (prompt
+    template version, model, temperature, max_tokens), so bumping ``QuantumPrompt.TEMPLATE_VERSION``
+    invalidates everything generated from the old prompt. Entries older than ``ttl`` seconds are
+    ignored in both tiers.
+    """
+
+    def __init__(self, max_entries: int = 1024, cache_dir: Optional[str] = LLM_CACHE_DIR, ttl: float = LLM_CACHE_TTL):
+        self._max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_dir = cache_dir
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        if self._cache_dir:
+            os.makedirs(self._cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(statement: str, template_version: str, model: str, temperature: float, max_tokens: int) -> str:
+        material = json.dumps([normalize_statement(statement), template_version, model, temperature, max_tokens])
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.json")
+
+    def _remember(self, key: str, stored_at: float, value: Dict[str, Any]) -> None:
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a deep copy of a fresh entry, promoting disk hits into memory."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+        elif self._cache_dir and os.path.exists(self._path(key)):
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                entry = (record["stored_at"], record["value"])
+                self._remember(key, *entry)
+            except Exception as e:
+                print(f"Discarding unreadable LLM cache entry {key}: {e}")
+        if entry is None or time.time() - entry[0] > self._ttl:
+            if entry is not None:
+                self._memory.pop(key, None)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        stored_at = time.time()
+        self._remember(key, stored_at, copy.deepcopy(value))
+        if self._cache_dir:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"stored_at": stored_at, "value": value}, f, default=str)
+                os.replace(tmp_path, self._path(key))
+            except Exception as e:
+                print(f"Could not persist LLM cache entry {key}: {e}")
+
+    def clear(self) -> None:
+        self._memory.clear()
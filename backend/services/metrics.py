@@ -0,0 +1,92 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 1536, 2048, 3072, 4096, 8192)
+
+class Histogram:
+    """Cumulative-bucket histogram rendered in the Prometheus text exposition format."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            label = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f'{self.name}_bucket{{le="{label}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {self.sum:.6f}")
+        lines.append(f"{self.name}_count {self.count}")
+        return "\n".join(lines)
+
+# stage -> (metric name, help, buckets, shown in Server-Timing)
+STAGES: Dict[str, Tuple[str, str, Sequence[float], bool]] = {
+    "prompt_tokens": ("deqcode_llm_prompt_tokens", "Prompt tokens sent per LLM call", TOKEN_BUCKETS, False),
+    "completion_tokens": ("deqcode_llm_completion_tokens", "Completion tokens returned per LLM call", TOKEN_BUCKETS, False),
+    "ttft": ("deqcode_llm_time_to_first_token_seconds", "Time to the first streamed completion chunk", SECONDS_BUCKETS, True),
+    "llm": ("deqcode_llm_generation_seconds", "Total LLM generation time per call", SECONDS_BUCKETS, True),
+    "parse": ("deqcode_json_extraction_seconds", "Time to extract the response JSON from a completion", SECONDS_BUCKETS, True),
+    "build": ("deqcode_circuit_build_seconds", "Time to build the circuit and Quirk payload from the response", SECONDS_BUCKETS, True),
+    "db": ("deqcode_db_write_seconds", "Time spent writing circuits and payloads to MongoDB", SECONDS_BUCKETS, True),
+    "total": ("deqcode_request_seconds", "End-to-end HTTP request time", SECONDS_BUCKETS, True),
+}
+HISTOGRAMS = {stage: Histogram(name, help_text, buckets) for stage, (name, help_text, buckets, _) in STAGES.items()}
+
+# Per-request stage totals; the middleware installs a fresh dict so endpoints and their tasks add to it
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("deqcode_request_timings", default=None)
+
+def start_request_timings() -> Dict[str, float]:
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+def observe(stage: str, value: float):
+    """Record one observation in the stage histogram and add it to the current request's total."""
+    HISTOGRAMS[stage].observe(value)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + value
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+def current_request_timings() -> Dict[str, float]:
+    """Snapshot of the stages recorded so far for the current request."""
+    return dict(_request_timings.get() or {})
+
+def merge_request_timings(timings: Dict[str, float]):
+    """Credit stages another request ran on our behalf (a coalesced leader) without observing them again."""
+    current = _request_timings.get()
+    if current is not None:
+        for stage, value in timings.items():
+            current.setdefault(stage, value)
+
+def timings_ms(timings: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(value * 1000, 1) for stage, value in timings.items() if STAGES[stage][3]}
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Server-Timing value in milliseconds; stages that ran concurrently (hedged calls) are summed."""
+    return ", ".join(f"{stage};dur={value:.1f}" for stage, value in timings_ms(timings).items())
+
+def render_metrics() -> str:
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS.values()) + "\n"
@@ -1,25 +1,107 @@
-from services.supportivegates import ElementsRequired
+import os
+import re
+from typing import List, NamedTuple, Optional, Tuple
+from services.gate_registry import GATE_REGISTRY, QUIRK_PALETTE_IDS, SCHEMA_GATES
+from services.supportivegates import example_prompt, json_structured_ouput
 
-class QuantumPrompt:
-    def get_prompt(statement : str)->str:
-        supportive_gates = ElementsRequired()
-        supported_gates = supportive_gates.supportive_gates()
-        example_prompt , json_structured_ouput = supportive_gates.sample_prompt()
-        return f""" Imagine yourself as a Quantum Circuit designer and load more complex quantum circuits at your Cache like shore algorithm and so on.
+PROMPT_TOKEN_BUDGET = int(os.environ.get("DEQCODE_PROMPT_TOKEN_BUDGET", "1600"))
+# Rough BPE estimate: words split into chunks of at most four characters, punctuation counted separately
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+# Schema gates that compile to Qiskit are always offered
+CORE_GATES = tuple(name for name in GATE_REGISTRY if name in SCHEMA_GATES and (GATE_REGISTRY[name].qiskit is not None or name == "Measure"))
+# Statement keywords -> Quirk palette gates worth offering for it
+GATE_KEYWORDS = [
+    (r"fourier|qft|period|shor|phase estimation", ["QFT2", "QFT3", "QFT†2", "QFT†3", "PhaseGradient3"]),
+    (r"phase|rotat|angle", ["Z^½", "Z^-½", "Z^¼", "Z^-¼", "Rzft", "Ryft", "Rxft"]),
+    (r"sqrt|square root|half", ["X^½", "X^-½", "Y^½", "Y^-½", "Z^½", "Z^-½"]),
+    (r"time|evolv|oscillat|animat", ["Z^t", "Y^t", "X^t", "Z^-t", "Y^-t", "X^-t", "Z^ft", "Y^ft", "X^ft"]),
+    (r"arithmetic|add|increment|decrement|modul|multipl|compar|counter|sum", [
+        "inc2", "inc3", "+=A2", "-=A2", "+=AB2", "-=AB2", "*A2", "/A2", "^A>B", "^A<B", "^A=B", "^A!=B", "^A>=B",
+        "incmodR2", "decmodR2", "+AmodR2", "*BToAmodR2", "inputA2", "inputA3", "inputB2", "inputB3",
+        "inputR2", "inputR3", "setA", "setB", "setR"
+    ]),
+    (r"detect|error|syndrome|parity|reset|correct", [
+        "ZDetector", "YDetector", "XDetector", "ZDetectControlReset", "YDetectControlReset", "XDetectControlReset",
+        "zpar", "xpar", "ypar"
+    ]),
+    (r"display|bloch|density|probabilit|amplitude|visuali", ["Density", "Density3", "Bloch", "Chance", "Amps2"]),
+    (r"control|condition", ["•", "◦", "⊕", "⊖", "⊗"]),
+    (r"postselect|project", ["|0⟩⟨0|", "|1⟩⟨1|", "|+⟩⟨+|", "|-⟩⟨-|", "|/⟩⟨/|", "|X⟩⟨X|"]),
+    (r"global phase|sign flip|negat", ["NeGate", "i", "-i", "√i", "√-i"]),
+]
+GATE_KEYWORDS = [(re.compile(pattern), [gate for gate in gates if gate in QUIRK_PALETTE_IDS]) for pattern, gates in GATE_KEYWORDS]
+
+def _compact(text: str) -> str:
+    return re.sub(r"[ \t]*\n[ \t]*", "\n", re.sub(r"[ \t]+", " ", text)).strip()
+
+# Static template, compacted once; \x00name\x00 marks a slot filled per request
+TEMPLATE_PARTS = _compact(""" Imagine yourself as a Quantum Circuit designer and load more complex quantum circuits at your Cache like shore algorithm and so on.
                     Yourself should design a Quantum circuit which is more optimized and can yield more accurate result.
-                    A Statement is given as {statement}, Infere the whole statement and divide them into chunks of statements.
-                    Think how to approach them in quantum and then solve the below instruction. 
-                    You must Generate circuits w.r.t these gates {supported_gates} and provide the explanation for the circuit along with the code in the required format.
+                    A Statement is given as \x00statement\x00, Infere the whole statement and divide them into chunks of statements.
+                    Think how to approach them in quantum and then solve the below instruction.
+                    You must Generate circuits w.r.t these gates \x00gates\x00 and provide the explanation for the circuit along with the code in the required format.
                     Think Smart before generating the gates and check for the different approaches with all the available gates and think about various possibilites of those parameteral gates.
                     Note: The circuit with minimal gates of more optimized approach is of more importance.
                     The output should only be in the json as mentioning the parameters and the gates.
-                    The keys of json are shown here as {json_structured_ouput}.
-                    Example of output generation is provided as {example_prompt}.
-                    Refer Algassert gates and formulas for producing the output.Kindly verify the format and then generate the json always.
-                    Avoid Parser Errors and ensure that returned json output is correct. 
+                    \x00keys\x00\x00example\x00Refer Algassert gates and formulas for producing the output.Kindly verify the format and then generate the json always.
+                    Avoid Parser Errors and ensure that returned json output is correct.
                     Note : 1. You should only provide the json in the Output no other explanations needed.
                            2.Provide consistency in generating the json output Object format.
                            3.Provide the code which is relevant to the json generated.
                            4.Pls check if there will any any error or exception arised
                            5.Check whether the Dependencies provided and imported are correct and maintain same package version
-                           6.Note: Most Important think is the user should not encounter any error during the execution. """
+                           6.Note: Most Important think is the user should not encounter any error during the execution. """).split("\x00")
+STATIC_TOKENS = sum(estimate_tokens(part) for part in TEMPLATE_PARTS[::2])
+# Optional sections in the order they are kept when the budget allows
+OPTIONAL_SECTIONS = [
+    ("example", f"Example of output generation is provided as {example_prompt}.\n"),
+    ("keys", f"The keys of json are shown here as {json_structured_ouput}.\n"),
+]
+SECTION_TOKENS = {name: estimate_tokens(text) for name, text in OPTIONAL_SECTIONS}
+
+class CompiledPrompt(NamedTuple):
+    text: str
+    token_count: int
+    gates: Tuple[str, ...]
+    sections: Tuple[str, ...]
+
+class QuantumPrompt:
+    TEMPLATE_VERSION = "2"  # bump whenever the prompt text changes; it keys the LLM response cache
+
+    @staticmethod
+    def relevant_gates(statement: str) -> List[str]:
+        lowered = statement.lower()
+        gates = list(CORE_GATES)
+        for pattern, extra in GATE_KEYWORDS:
+            if pattern.search(lowered):
+                gates.extend(gate for gate in extra if gate not in gates)
+        return gates
+
+    @staticmethod
+    def compile(statement: str, budget: Optional[int] = None, reserved_tokens: int = 0) -> CompiledPrompt:
+        """Fill the precompiled template, keeping optional sections and retrieved gates only while they fit the budget."""
+        budget = budget if budget is not None else PROMPT_TOKEN_BUDGET
+        gates = QuantumPrompt.relevant_gates(statement)
+        used = STATIC_TOKENS + estimate_tokens(statement) + reserved_tokens
+        gate_tokens = estimate_tokens(str(gates))
+        # Retrieved palette gates are trimmed before the core schema gates
+        while used + gate_tokens > budget and len(gates) > len(CORE_GATES):
+            gates.pop()
+            gate_tokens = estimate_tokens(str(gates))
+        used += gate_tokens
+        sections = {}
+        for name, text in OPTIONAL_SECTIONS:
+            if used + SECTION_TOKENS[name] <= budget:
+                sections[name] = text
+                used += SECTION_TOKENS[name]
+        slots = {"statement": statement, "gates": str(gates), **{name: "" for name, _ in OPTIONAL_SECTIONS}, **sections}
+        text = "".join(part if i % 2 == 0 else slots[part] for i, part in enumerate(TEMPLATE_PARTS))
+        return CompiledPrompt(text, used - reserved_tokens, tuple(gates), tuple(sections))
+
+    @staticmethod
+    def get_prompt(statement : str)->str:
+        return QuantumPrompt.compile(statement).text
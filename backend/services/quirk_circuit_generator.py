@@ -1,24 +1,41 @@
+import asyncio
+import copy
 import json
 import os
+from typing import Any, Callable, Optional, Tuple
+import httpx
 from fastapi.exceptions import HTTPException
 from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 from langchain.output_parsers import StructuredOutputParser, ResponseSchema
-from services.prompt_manager import QuantumPrompt
+from services.gate_registry import SCHEMA_GATES
+from services.llm_backends import LLMBackend, GroqBackend, RecordReplayBackend, StubBackend
+from services.llm_cache import LLMResponseCache
+from services.metrics import observe, timed
+from services.prompt_manager import QuantumPrompt, estimate_tokens
 from services.util import extract_json_from_content
 from dotenv import load_dotenv
 
 load_dotenv()
 
-api_key = os.environ["GROQ_API_KEY"]
+api_key = os.environ.get("GROQ_API_KEY")
+# groq | stub | replay | record: the last two read and write DEQCODE_LLM_REPLAY_PATH
+LLM_BACKEND = os.environ.get("DEQCODE_LLM_BACKEND", "groq")
+LLM_TIMEOUT = float(os.environ.get("DEQCODE_LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("DEQCODE_LLM_MAX_CONNECTIONS", "20"))
+LLM_MODEL = "llama3-8b-8192"
+LLM_TEMPERATURE = 0.5
+LLM_MAX_TOKENS = 3000
+# Concurrent generations per /design-circuit; with a delay the extra ones only start if the first is slow
+LLM_HEDGES = int(os.environ.get("DEQCODE_LLM_HEDGES", "1"))
+LLM_HEDGE_DELAY = float(os.environ.get("DEQCODE_LLM_HEDGE_DELAY", "0"))
+# Raw completions are appended here when set, building the corpus for Research/JsonExtractionBenchmark.py
+LLM_CAPTURE_PATH = os.environ.get("DEQCODE_LLM_CAPTURE_PATH")
 
 #Sample code Not Included in Production
 class QuirkCircuitGenerator:
     def __init__(self):
-        self.supported_gates = {
-            "H", "X", "Y", "Z", "S", "T", "CX", "CCX", "SWAP", "RX", "RY", "RZ",
-            "Measure", "InputA", "InputB", "InputC"
-        }
+        self.supported_gates = SCHEMA_GATES
         self.circuit = []
         self.qubit_count = 0
 
@@ -55,41 +72,195 @@ class QuirkCircuitGenerator:
         except Exception as e:
             return HTTPException(status_code=500,detail=f"{e}")
         
+# Built once: the schema and its format instructions never change between requests
+response_schemas = [
+    ResponseSchema(name="Parameter", description="Generate the parameter as per the prmpt"),
+    ResponseSchema(name="gates", description="Generate the gates as per the prompt"),
+    ResponseSchema(name="code",description="The Relative Qiskit code for the circuit should be generated"),
+    ResponseSchema(name="explanation", description="This contains the explanation of the code and circuit")
+]
+format_instructions = StructuredOutputParser.from_response_schemas(response_schemas).get_format_instructions(only_json=True)
+SYSTEM_PROMPT = "You are a helpful assistant providing answers only in a structured valid JSON format."
+RESERVED_PROMPT_TOKENS = estimate_tokens(format_instructions) + estimate_tokens(SYSTEM_PROMPT)
+
+def create_llm_client(timeout: float = LLM_TIMEOUT) -> ChatGroq:
+    """One long-lived ChatGroq client whose httpx pools keep connections to Groq alive across requests."""
+    limits = httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_CONNECTIONS)
+    return ChatGroq(
+        api_key=api_key,
+        timeout=timeout,
+        max_retries=1,
+        http_client=httpx.Client(limits=limits, timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+    )
+
+def create_backend(name: str = LLM_BACKEND, timeout: float = LLM_TIMEOUT) -> LLMBackend:
+    if name == "groq":
+        return GroqBackend(create_llm_client(timeout))
+    if name == "stub":
+        return StubBackend()
+    if name == "replay":
+        return RecordReplayBackend(fallback=StubBackend())
+    if name == "record":
+        return RecordReplayBackend(fallback=GroqBackend(create_llm_client(timeout)), record=True)
+    raise ValueError(f"Unknown LLM backend '{name}'")
+
 class QuantumLLM:
-    def __init__(self):
-        self.quantum = ChatGroq(api_key=api_key)
+    def __init__(self, backend: Optional[LLMBackend] = None, timeout: float = LLM_TIMEOUT, cache: Optional[LLMResponseCache] = None):
+        self.backend = backend if backend is not None else create_backend(timeout=timeout)
+        self.timeout = timeout
+        self.cache = cache
 
-    def llm_request(self, statements: str) -> object:
+    @staticmethod
+    def _messages(statements: str) -> Tuple[list, int]:
+        """Chat messages for the statement and their estimated prompt token count."""
+        compiled = QuantumPrompt.compile(statements, reserved_tokens=RESERVED_PROMPT_TOKENS)
+        prompt_template = f"{compiled.text}\n\n{format_instructions}"
+        return [
+            SystemMessage(content=SYSTEM_PROMPT),
+            HumanMessage(content=prompt_template)
+        ], compiled.token_count + RESERVED_PROMPT_TOKENS
+
+    @staticmethod
+    def cache_key(statements: str) -> str:
+        return LLMResponseCache.make_key(statements, QuantumPrompt.TEMPLATE_VERSION, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS)
+
+    async def _generate(self, statements: str, timeout: Optional[float] = None) -> dict:
+        """One uncached completion, parsed into the response dict.
+
+        It is read through llm_stream so time to first token is measured here too; backends that
+        cannot stream deliver everything in one piece, making it equal to the generation time.
+        """
         try:
-            # Define response schemas for structured JSON output
-            response_schemas = [
-                ResponseSchema(name="Parameter", description="Generate the parameter as per the prmpt"),
-                ResponseSchema(name="gates", description="Generate the gates as per the prompt"),
-                ResponseSchema(name="code",description="The Relative Qiskit code for the circuit should be generated"),
-                ResponseSchema(name="explanation", description="This contains the explanation of the code and circuit")
-            ]
-
-            # Create the StructuredOutputParser and Formatting 
-            parser = StructuredOutputParser.from_response_schemas(response_schemas)
-            format_instructions = parser.get_format_instructions(only_json=True)
-            user_input = QuantumPrompt.get_prompt(statement=statements)
-            prompt_template = f"{user_input}\n\n{format_instructions}"
-
-            # Prepare the messages
-            messages = [
-                SystemMessage(content="You are a helpful assistant providing answers only in a structured valid JSON format."),
-                HumanMessage(content=prompt_template)
-            ]
-            response = self.quantum.invoke(messages, model="llama3-8b-8192", temperature=0.5, max_tokens=3000, top_p=1)
-            content_str = response.content
-            #print(content_str)
+            content_str = "".join([chunk async for chunk in self.llm_stream(statements, timeout)])
+            if LLM_CAPTURE_PATH:
+                with open(LLM_CAPTURE_PATH, "a", encoding="utf-8") as capture:
+                    capture.write(json.dumps({"statement": statements, "content": content_str}) + "\n")
             try:
-                #content = json.loads(content_str)  
-                content = extract_json_from_content(content_str)
+                with timed("parse"):
+                    return extract_json_from_content(content_str)
             except json.JSONDecodeError as json_err:
                 raise HTTPException(status_code=500, detail=f"JSON decode error: {json_err}")
-            #print(content)
-            return content
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"{e}")
 
+    async def llm_request(self, statements: str, timeout: Optional[float] = None, use_cache: bool = True) -> object:
+        cache_key = self.cache_key(statements)
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        content = await self._generate(statements, timeout)
+        if self.cache is not None:
+            self.cache.put(cache_key, content)
+        return content
+
+    async def hedged_request(self, statements: str, validate: Callable[[dict], Tuple[Any, bool]], hedges: int = LLM_HEDGES,
+                             hedge_delay: float = LLM_HEDGE_DELAY, timeout: Optional[float] = None, use_cache: bool = True) -> Tuple[dict, Any]:
+        """Race up to ``hedges`` generations and return (response, validate(response)) for the first clean one.
+
+        ``validate`` gets a copy of each parsed response and returns (built, clean), raising when the
+        response cannot be built at all. With ``hedge_delay`` > 0 the next generation starts only after
+        that many seconds without a clean result, or as soon as one fails; otherwise all start at once.
+        The losers are cancelled. If none is clean, the first one that built is returned, and only
+        the winner is cached.
+        """
+        cache_key = self.cache_key(statements)
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return cached, validate(copy.deepcopy(cached))[0]
+                except Exception as e:
+                    print(f"Cached response failed validation, regenerating: {e}")
+
+        async def attempt(index: int):
+            content = await self._generate(statements, timeout)
+            built, clean = validate(copy.deepcopy(content))
+            return index, content, built, clean
+
+        pending = set()
+        launched = 0
+        fallback = None
+        error = None
+        hedges = max(1, hedges)
+        try:
+            while True:
+                while launched < hedges and (not pending or hedge_delay <= 0):
+                    pending.add(asyncio.ensure_future(attempt(launched)))
+                    launched += 1
+                done, pending = await asyncio.wait(
+                    pending, timeout=hedge_delay if hedge_delay > 0 and launched < hedges else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # Latency threshold passed with nothing back: fire the next hedge
+                    pending.add(asyncio.ensure_future(attempt(launched)))
+                    launched += 1
+                    continue
+                winner = None
+                for task in done:
+                    try:
+                        index, content, built, clean = task.result()
+                    except Exception as e:
+                        print(f"Hedged generation failed: {e}")
+                        error = e
+                        continue
+                    if clean and winner is None:
+                        print(f"Hedged generation: attempt {index + 1}/{launched} won")
+                        winner = (content, built)
+                    elif fallback is None:
+                        fallback = (content, built)
+                if winner is None and (pending or launched < hedges):
+                    continue
+                result = winner or fallback
+                if result is None:
+                    raise error if error is not None else HTTPException(status_code=500, detail="No valid LLM response")
+                if self.cache is not None:
+                    self.cache.put(cache_key, result[0])
+                return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def llm_stream(self, statements: str, timeout: Optional[float] = None):
+        """Yield completion text chunks as the backend produces them; the whole stream shares one deadline."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + (timeout or self.timeout)
+        messages, prompt_tokens = self._messages(statements)
+        stream = self.backend.stream(
+            statements, messages, model=LLM_MODEL, temperature=LLM_TEMPERATURE, max_tokens=LLM_MAX_TOKENS, top_p=1
+        )
+        completion_tokens = 0
+        reported_prompt_tokens = reported_completion_tokens = None
+        first_chunk = True
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout=remaining)
+                reported_prompt_tokens = chunk.prompt_tokens or reported_prompt_tokens
+                reported_completion_tokens = chunk.completion_tokens or reported_completion_tokens
+                if chunk.content:
+                    if first_chunk:
+                        observe("ttft", loop.time() - started)
+                        first_chunk = False
+                    completion_tokens += estimate_tokens(chunk.content)
+                    yield chunk.content
+        except StopAsyncIteration:
+            observe("llm", loop.time() - started)
+            # Provider-reported usage when available, otherwise the estimates
+            observe("prompt_tokens", reported_prompt_tokens or prompt_tokens)
+            observe("completion_tokens", reported_completion_tokens or completion_tokens)
+            return
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="LLM request timed out")
+        finally:
+            await stream.aclose()
+
+    async def aclose(self):
+        await self.backend.aclose()
@@ -0,0 +1,142 @@
+import json
+import urllib.parse
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+from qiskit import ClassicalRegister, QuantumCircuit
+from qiskit.circuit.library import SwapGate
+from services.algassertprod import GateJsonCompiler
+from services.gate_registry import QUIRK_GATES_BY_ID
+from services.quirk_payload import decode_quirk_payload, quirk_payload_hash
+
+# Quirk id -> fixed Qiskit gate; multi-row gates occupy their row and the rows below it,
+# zero-row gates are phases
+QUIRK_GATES = {
+    quirk_id: spec.qiskit for quirk_id, spec in QUIRK_GATES_BY_ID.items()
+    if spec.qiskit is not None and spec.param_count == 0 and quirk_id != "Swap"
+}
+QUIRK_CONTROLS = {"•": 1, "◦": 0}
+QUIRK_NO_OPS = {1, "…", "Density", "Density3", "Bloch", "Chance", "Amps2", "Amps3", "Amps4"}
+
+class QuirkImporter:
+    """Parses a Quirk URL, a ``{"cols": ...}`` JSON document or a compact stored payload into a Qiskit circuit.
+
+    Native Quirk columns (one entry per row, ``"•"``/``"◦"`` controls applying to the whole column)
+    are built gate by gate; columns in DeqcodeAI's own ``{"id", "targets"}`` form are routed
+    through ``GateJsonCompiler``. Results are cached by payload hash and handed out as copies.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[QuantumCircuit, List[dict]]]" = OrderedDict()
+
+    @staticmethod
+    def _extract_payload(source: str) -> str:
+        source = source.strip()
+        if "#" in source and "circuit=" in source:
+            # Quirk percent-encodes only some characters ({%22cols%22:[[%22H%22]]}), so always decode
+            return urllib.parse.unquote(source.split("circuit=", 1)[1])
+        return urllib.parse.unquote(source) if source.startswith("%") else source
+
+    def parse(self, source: str) -> Tuple[QuantumCircuit, List[dict]]:
+        payload = self._extract_payload(source)
+        key = quirk_payload_hash(payload)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+        else:
+            # Every malformed input surfaces as ValueError so callers can report it as a bad request
+            try:
+                document = json.loads(payload)
+                # A bare list is a compact payload written by quirk_payload.encode_quirk_payload
+                if isinstance(document, list):
+                    cols = decode_quirk_payload(payload)["cols"]
+                elif isinstance(document, dict):
+                    cols = document.get("cols", [])
+                else:
+                    raise ValueError("expected a Quirk URL, a {\"cols\": ...} object or a compact payload")
+                if not isinstance(cols, list) or not all(isinstance(column, list) for column in cols):
+                    raise ValueError("\"cols\" must be a list of columns")
+                built = self._build(cols)
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f"{type(e).__name__}: {e}") from e
+            self._cache[key] = built
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        circuit, diagnostics = self._cache[key]
+        return circuit.copy(), [dict(item) for item in diagnostics]
+
+    def _build(self, cols: List[List[Any]]) -> Tuple[QuantumCircuit, List[dict]]:
+        if any(isinstance(entry, dict) and "targets" in entry for column in cols for entry in column):
+            return self._build_from_gate_dicts(cols)
+        return self._build_native(cols)
+
+    @staticmethod
+    def _build_from_gate_dicts(cols: List[List[Dict[str, Any]]]) -> Tuple[QuantumCircuit, List[dict]]:
+        gates = []
+        for column in cols:
+            for entry in column:
+                gates.append({
+                    "gate": entry.get("id"),
+                    "qubits": list(entry.get("controls", [])) + list(entry.get("targets", [])),
+                    "params": entry.get("params", [])
+                })
+        gates, n, diagnostics = GateJsonCompiler.normalize({"Parameters": [{"n": 1}], "gates": gates})
+        qc, _ = GateJsonCompiler.compile(gates, n, diagnostics)
+        return qc, diagnostics
+
+    @staticmethod
+    def _row_span(entry: Any) -> int:
+        gate_id = entry.get("id") if isinstance(entry, dict) else entry
+        gate = QUIRK_GATES.get(gate_id) if isinstance(gate_id, str) else None
+        return max(1, gate.num_qubits) if gate is not None else 1
+
+    @classmethod
+    def _build_native(cls, cols: List[List[Any]]) -> Tuple[QuantumCircuit, List[dict]]:
+        # Multi-row gates such as "QFT3" reach below the last listed row
+        num_qubits = max([row + cls._row_span(entry) for column in cols for row, entry in enumerate(column)] + [1])
+        qc = QuantumCircuit(num_qubits)
+        measurements = None
+        diagnostics = []
+        for column_index, column in enumerate(cols):
+            controls = [(row, QUIRK_CONTROLS[entry]) for row, entry in enumerate(column) if isinstance(entry, str) and entry in QUIRK_CONTROLS]
+            control_rows = [row for row, _ in controls]
+            control_state = sum(1 << i for i, (_, state) in enumerate(controls) if state)
+
+            def place(gate, rows):
+                if controls:
+                    qc.append(gate.control(len(controls), ctrl_state=control_state), control_rows + rows, copy=False)
+                else:
+                    qc.append(gate, rows, copy=False)
+
+            swap_rows = []
+            for row, entry in enumerate(column):
+                gate_id = entry.get("id") if isinstance(entry, dict) else entry
+                if not isinstance(gate_id, (str, int)):
+                    diagnostics.append({"index": column_index, "gate": None, "level": "error",
+                                        "message": f"unreadable Quirk entry on row {row}"})
+                    continue
+                if gate_id in QUIRK_CONTROLS or gate_id in QUIRK_NO_OPS:
+                    continue
+                if gate_id in QUIRK_GATES:
+                    gate = QUIRK_GATES[gate_id]
+                    if gate.num_qubits == 0 and not controls:
+                        qc.global_phase += gate.params[0]
+                    else:
+                        place(gate, list(range(row, row + gate.num_qubits)))
+                elif gate_id == "Swap":
+                    swap_rows.append(row)
+                elif gate_id == "Measure":
+                    if measurements is None:
+                        measurements = ClassicalRegister(num_qubits, "meas")
+                        qc.add_register(measurements)
+                    qc.measure(row, measurements[row])
+                else:
+                    diagnostics.append({"index": column_index, "gate": gate_id, "level": "error",
+                                        "message": f"unsupported Quirk gate on row {row}"})
+            if len(swap_rows) == 2:
+                place(SwapGate(), swap_rows)
+            elif swap_rows:
+                diagnostics.append({"index": column_index, "gate": "Swap", "level": "error",
+                                    "message": "Swap needs exactly two rows in a column"})
+        return qc, diagnostics
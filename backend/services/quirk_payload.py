@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import json
+import re
+import urllib.parse
+from typing import Any, Dict, List, Optional
+
+QUIRK_BASE_URL = "https://algassert.com/quirk#circuit="
+# quirk_payload_hash output: 9 digest bytes as unpadded URL-safe base64
+QUIRK_HASH_PATTERN = re.compile(r"[A-Za-z0-9_-]{12}")
+
+def _compact_gate(gate_dict: Dict[str, Any]) -> List[Any]:
+    # {"id": "RX", "targets": [0], "params": [0.5]} -> ["RX", [0], [0.5]]; trailing empty fields are dropped
+    compact = [gate_dict["id"], gate_dict.get("targets", []), gate_dict.get("params", []), gate_dict.get("controls", [])]
+    while len(compact) > 2 and not compact[-1]:
+        compact.pop()
+    return compact
+
+def _expand_gate(compact: List[Any]) -> Dict[str, Any]:
+    gate_dict = {"id": compact[0], "targets": compact[1] if len(compact) > 1 else []}
+    if len(compact) > 3 and compact[3]:
+        gate_dict["controls"] = compact[3]
+    if len(compact) > 2 and compact[2]:
+        gate_dict["params"] = compact[2]
+    return gate_dict
+
+def encode_quirk_payload(cols: List[List[Dict[str, Any]]]) -> str:
+    """Serialize Quirk columns as whitespace-free JSON with positional gate entries."""
+    return json.dumps([[_compact_gate(gate) for gate in column] for column in cols], separators=(",", ":"))
+
+def decode_quirk_payload(payload: str) -> Dict[str, Any]:
+    """Inverse of encode_quirk_payload, returning the {"cols": ...} structure."""
+    return {"cols": [[_expand_gate(gate) for gate in column] for column in json.loads(payload)]}
+
+def quirk_payload_hash(payload: str) -> str:
+    digest = hashlib.blake2b(payload.encode("utf-8"), digest_size=9).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii")
+
+def quirk_short_link_hash(source: str) -> Optional[str]:
+    """The hash in a /q/{hash} short link or a bare hash, or None when the source is neither."""
+    candidate = source.strip().rstrip("/")
+    if "/q/" in candidate:
+        candidate = candidate.rsplit("/q/", 1)[1]
+    return candidate if QUIRK_HASH_PATTERN.fullmatch(candidate) else None
+
+def quirk_url_from_payload(payload: str) -> str:
+    quirk_data = decode_quirk_payload(payload)
+    return QUIRK_BASE_URL + urllib.parse.quote(json.dumps(quirk_data, separators=(",", ":")))
@@ -0,0 +1,128 @@
+import copy
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import numpy as np
+from services.gate_registry import SCHEMA_GATES
+
+SEMANTIC_CACHE_PATH = os.environ.get("DEQCODE_SEMANTIC_CACHE_PATH", "semantic_cache.jsonl")
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("DEQCODE_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+
+# Common spellings folded together before hashing, so paraphrases share features
+SYNONYMS = {
+    "rng": ["random", "number", "generator"], "qbit": ["qubit"], "ghz": ["ghz", "entangle"], "bell": ["bell", "entangle"],
+    "entangled": ["entangle"], "entanglement": ["entangle"], "qft": ["fourier"], "generate": ["generator"],
+    "generating": ["generator"]
+}
+# Words that change which circuit is meant; paraphrases must agree on them exactly, because a single
+# swapped axis or an added "inverse" barely moves the cosine score
+KEY_TERMS = {
+    **{name.lower(): name.lower() for name in SCHEMA_GATES},
+    "x": "x", "y": "y", "z": "z", "hadamard": "h", "cnot": "cx", "toffoli": "ccx", "fredkin": "cswap", "swap": "swap",
+    "inverse": "inverse", "invert": "inverse", "inverted": "inverse", "dagger": "inverse", "adjoint": "inverse",
+    "uncompute": "inverse", "controlled": "controlled", "control": "controlled", "multi": "multi"
+}
+STOP_WORDS = frozenset({"a", "an", "the", "of", "for", "with", "to", "and", "in", "on", "using", "that", "which", "me", "please", "circuit"})
+
+class HashingVectorizer:
+    """Maps a statement to an L2-normalised vector of hashed word and character-trigram features."""
+
+    def __init__(self, dimensions: int = 2048):
+        self.dimensions = dimensions
+
+    @staticmethod
+    def tokens(statement: str) -> List[str]:
+        tokens = []
+        for word in re.findall(r"[a-z]+|\d+", statement.lower()):
+            if word in STOP_WORDS:
+                continue
+            word = word[:-1] if len(word) > 3 and word.endswith("s") else word
+            tokens.extend(SYNONYMS.get(word, [word]))
+        return tokens
+
+    def _index(self, feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dimensions
+
+    def transform(self, statement: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = self.tokens(statement)
+        for token in tokens:
+            vector[self._index(f"w:{token}")] += 1.0
+            padded = f"#{token}#"
+            for i in range(len(padded) - 2):
+                vector[self._index(f"c:{padded[i:i + 3]}")] += 0.3
+        for first, second in zip(tokens, tokens[1:]):
+            vector[self._index(f"b:{first} {second}")] += 0.5
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class SemanticCache:
+    """In-memory cosine index over past /design-circuit statements and their stored results.
+
+    Vectors live in one preallocated matrix, so a lookup is a single matrix-vector product.
+    Statements must also mention the same numbers ("3 qubits" never matches "5 qubits") and the same
+    gate, axis and modifier words (KEY_TERMS), so "inverse QFT" never matches "QFT".
+    Results are deep-copied on the way in and out, like the other response caches.
+    Entries are appended to a JSONL file, which stops growing once ``max_entries`` is reached,
+    and re-vectorised when the cache is warm-loaded.
+    """
+
+    def __init__(self, path: Optional[str] = SEMANTIC_CACHE_PATH, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = 50000, vectorizer: Optional[HashingVectorizer] = None):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self._vectors = np.zeros((64, self.vectorizer.dimensions), dtype=np.float32)
+        self._entries: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _numbers(statement: str) -> List[str]:
+        return sorted(re.findall(r"\d+(?:\.\d+)?", statement))
+
+    def _key_terms(self, statement: str) -> FrozenSet[str]:
+        return frozenset(KEY_TERMS[token] for token in self.vectorizer.tokens(statement) if token in KEY_TERMS)
+
+    def _append(self, statement: str, result: Dict[str, Any]) -> bool:
+        if len(self._entries) >= self.max_entries:
+            return False
+        if len(self._entries) == len(self._vectors):
+            self._vectors = np.vstack([self._vectors, np.zeros_like(self._vectors)])
+        self._vectors[len(self._entries)] = self.vectorizer.transform(statement)
+        self._entries.append({"statement": statement, "numbers": self._numbers(statement),
+                              "terms": self._key_terms(statement), "result": copy.deepcopy(result)})
+        return True
+
+    def load(self) -> "SemanticCache":
+        if self.path and os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._append(record["statement"], record["result"])
+        return self
+
+    def lookup(self, statement: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        if not self._entries:
+            return None
+        scores = self._vectors[:len(self._entries)] @ self.vectorizer.transform(statement)
+        numbers, terms = self._numbers(statement), self._key_terms(statement)
+        for index in np.argsort(scores)[::-1][:5]:
+            if scores[index] < self.threshold:
+                break
+            if self._entries[index]["numbers"] == numbers and self._entries[index]["terms"] == terms:
+                return copy.deepcopy(self._entries[index]["result"]), float(scores[index])
+        return None
+
+    def add(self, statement: str, result: Dict[str, Any]) -> None:
+        if self._append(statement, result) and self.path:
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"statement": statement, "result": result}, default=str) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
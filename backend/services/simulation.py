@@ -13,16 +13,20 @@ class QuantumSimulator:
             exec(code, exec_globals)
             if "qc" not in exec_globals:
                 raise ValueError("Qiskit code must define a QuantumCircuit named 'qc'")
-            qc = exec_globals["qc"]
-            simulator = AerSimulator()
-            compiled_circuit = transpile(qc, simulator)
-            result = simulator.run(compiled_circuit).result()
-            counts = result.get_counts()
-            print(f"Qiskit simulation result: {counts}")
-            return counts
+            return self.qiskit_circuit_simulate(exec_globals["qc"])
         except Exception as e:
             return f"Qiskit Simulation Error: {e}"
 
+    def qiskit_circuit_simulate(self, qc: QuantumCircuit):
+        if not any(instruction.operation.name == "measure" for instruction in qc.data):
+            qc = qc.measure_all(inplace=False)
+        simulator = AerSimulator()
+        compiled_circuit = transpile(qc, simulator)
+        result = simulator.run(compiled_circuit).result()
+        counts = result.get_counts()
+        print(f"Qiskit simulation result: {counts}")
+        return counts
+
     def cirq_code_simulate(self, code: str):
         try:
             exec_globals = {"cirq": cirq}
@@ -1,3 +1,4 @@
+from services.gate_registry import QUIRK_PALETTE, QUIRK_PALETTE_IDS
 gates_data = [
   {"name": "Measure", "valueRepresentation": "Measure"},
   {"name": "|0⟩⟨0|", "valueRepresentation": "|0⟩⟨0|"},
@@ -71,7 +72,7 @@ gates_data = [
   {"name": "√-i", "valueRepresentation": "√-i"},
   {"name": "√i", "valueRepresentation": "√i"}
 ]
-gates_avail = ["Measure","|0⟩⟨0|","|1⟩⟨1|","•","◦","Density","Density3","Bloch","Chance","Amps2","Z","Y","X","inputA4","Z^-½","Z^½","X^½","Y^½","Y^-½","X^-½","Z^¼","Y^¼","X^¼","Z^-¼","Y^-¼","X^-¼","Z^t","Y^t","X^t","Z^-t","Y^-t","X^-t","Z^ft","Y^ft","X^ft","Rzft","Ryft","Rxft","Z^(A/2^n)","inputA2","Z^(-A/2^n)","Ryft","X^ft","ZDetector","YDetector","ZDetectControlReset","YDetectControlReset","XDetector","XDetectControlReset","zpar","xpar","ypar","⊕","⊗","⊖","|+⟩⟨+|","|-⟩⟨-|","|/⟩⟨/|","|X⟩⟨X|","QFT2","QFT3","QFT†2","QFT†3","PhaseGradient3","grad^-t2","inputA3","inputB2","inputB3","inputR2","inputR3","setR","setB","setA","inc2","inc3","+=A2","+=AB2","^A!=B","-=AB2","^A>=B","^A=B","*A2","/A2","-=A2","^A>B","^A<B","incmodR2","decmodR2","+AmodR2","*BToAmodR2","…","0","NeGate","-i","i","√-i","√i"]
+gates_avail = list(QUIRK_PALETTE)
 example_prompt = """{"Parameters":[{"n":3,"p":0.5}],"gates":[{"gate":"H","qubit":0},{"gate":"RX","qubit":0,"angle":"acos(sqrt(p))"},{"gate":"Measure","qubit":0},{"gate":"RY","params":[0.5],"qubit":2},{"gate":"CCX","control_qubit":0,"target_qubit":1},],"explanation":"This circuit generates a random number by applying Hadamard gates, RX gates with a probability p, and measuring the qubits.The CX gate is used to entangle the qubits."}"""
 json_structured_ouput = """ {{"Parameters":[{{0:{parameters[0]}1:{parameters[1]}}}],"gates":[0:{gates[0]}1:{gates[1]}],"code":[
     "from qiskit import QuantumCircuit\n",
@@ -90,8 +91,7 @@ class ElementsRequired:
     def supportive_gates(self):
        return gates_avail
     def check_gate_availability(self,gate_name: str)-> bool:
-        if gate_name in gates_avail: return True
-        else : return False 
+        return gate_name in QUIRK_PALETTE_IDS
     def sample_prompt(self):
         return example_prompt,json_structured_ouput
     
\ No newline at end of file
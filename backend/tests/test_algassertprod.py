@@ -0,0 +1,81 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.algassertprod import GateJsonCompiler, QuantumCircuitGenerator
+
+def test_measure_without_qubits_defaults_to_qubit_zero():
+    gates, _, diagnostics = GateJsonCompiler.normalize({"Parameters": [{"n": 2}], "gates": [{"gate": "Measure"}]})
+    assert gates == [{"gate": "Measure", "qubits": [0], "params": []}]
+    assert diagnostics == []
+
+def test_quirk_only_gates_are_reported_when_left_out_of_the_circuit():
+    qc, generator, diagnostics = QuantumCircuitGenerator.build_from_json(
+        {"Parameters": [{"n": 1}], "gates": [{"gate": "InputA", "qubit": 0}, {"gate": "H", "qubit": 0}]})
+    assert [instr.operation.name for instr in qc.data] == ["h"]
+    assert [column[0]["id"] for column in generator.circuit] == ["InputA", "H"]
+    assert [(item["gate"], item["level"]) for item in diagnostics] == [("InputA", "warning")]
+
+def columns(generator: QuantumCircuitGenerator):
+    return [[(gate["id"], tuple(gate.get("controls", [])) + tuple(gate["targets"])) for gate in column] for column in generator.circuit]
+
+def test_independent_gates_share_a_column():
+    generator = QuantumCircuitGenerator()
+    generator.add_qubits(3)
+    generator.add_gate("H", [0])
+    generator.add_gate("H", [1])
+    generator.add_gate("CX", [0, 1])
+    generator.add_gate("X", [2])
+    assert columns(generator) == [[("H", (0,)), ("H", (1,)), ("X", (2,))], [("CX", (0, 1))]]
+
+def test_controlled_gates_get_their_own_column():
+    generator = QuantumCircuitGenerator()
+    generator.add_qubits(3)
+    generator.add_gate("X", [1], controls=[0])
+    generator.add_gate("H", [2])
+    assert columns(generator) == [[("X", (0, 1))], [("H", (2,))]]
+
+def test_gate_without_qubits_goes_after_every_other_gate():
+    generator = QuantumCircuitGenerator()
+    generator.add_qubits(2)
+    generator.add_gate("H", [0])
+    generator.add_gate("CX", [0, 1])
+    generator.add_gate("Measure", [])
+    generator.add_gate("X", [1])
+    assert columns(generator) == [[("H", (0,))], [("CX", (0, 1))], [("Measure", ())], [("X", (1,))]]
+
+def peephole(gates):
+    from services.algassertprod import GatePeepholeOptimizer
+    return GatePeepholeOptimizer.optimize(gates)
+
+def test_self_inverse_pairs_cancel_in_cascade():
+    gates = [{"gate": "H", "qubit": 0}, {"gate": "X", "qubit": 0}, {"gate": "X", "qubit": 0}, {"gate": "H", "qubit": 0},
+             {"gate": "CX", "qubits": [0, 1]}, {"gate": "CX", "qubits": [0, 1]}, {"gate": "SWAP", "qubits": [0, 1]},
+             {"gate": "SWAP", "qubits": [1, 0]}]
+    optimized, stats = peephole(gates)
+    assert optimized == []
+    assert stats["cancelled"] == 8 and stats["output_gates"] == 0
+
+def test_gates_on_other_qubits_do_not_block_but_overlapping_ones_do():
+    gates = [{"gate": "H", "qubit": 0}, {"gate": "X", "qubit": 1}, {"gate": "H", "qubit": 0},
+             {"gate": "Z", "qubit": 2}, {"gate": "CX", "qubits": [2, 1]}, {"gate": "Z", "qubit": 2}]
+    optimized, _ = peephole(gates)
+    assert optimized == [{"gate": "X", "qubit": 1}, {"gate": "Z", "qubit": 2}, {"gate": "CX", "qubits": [2, 1]},
+                         {"gate": "Z", "qubit": 2}]
+
+def test_rotations_merge_and_full_turns_are_dropped():
+    import math
+    gates = [{"gate": "RZ", "qubit": 0, "params": [0.25]}, {"gate": "RZ", "qubit": 0, "angle": 0.5},
+             {"gate": "RX", "qubit": 1, "params": [2 * math.pi]},
+             {"gate": "RY", "qubit": 2, "params": [math.pi]}, {"gate": "RY", "qubit": 2, "params": [math.pi]}]
+    optimized, stats = peephole(gates)
+    assert optimized == [{"gate": "RZ", "qubit": 0, "params": [0.75]}]
+    assert stats["merged"] == 2 and stats["dropped"] == 2
+
+def test_measure_and_symbolic_angles_are_barriers():
+    gates = [{"gate": "X", "qubit": 0}, {"gate": "Measure", "qubit": 0}, {"gate": "X", "qubit": 0},
+             {"gate": "RZ", "qubit": 1, "angle": "theta"}, {"gate": "RZ", "qubit": 1, "angle": "theta"}]
+    optimized, _ = peephole(gates)
+    assert optimized == gates
@@ -0,0 +1,57 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+pytest.importorskip("cirq")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from qiskit import QuantumCircuit
+from services.circuit_summary import CircuitSummary, parse_circuit
+
+def measured(first_clbit: int, second_clbit: int) -> QuantumCircuit:
+    qc = QuantumCircuit(2, 2)
+    qc.h(0)
+    qc.cx(0, 1)
+    qc.measure(0, first_clbit)
+    qc.measure(1, second_clbit)
+    return qc
+
+def fingerprint(circuit: QuantumCircuit) -> str:
+    return CircuitSummary.from_circuit(circuit).fingerprint
+
+def test_measurement_targets_change_the_fingerprint():
+    assert fingerprint(measured(0, 1)) != fingerprint(measured(1, 0))
+    assert fingerprint(measured(0, 1)) == fingerprint(measured(0, 1))
+
+def test_control_flow_blocks_change_the_fingerprint():
+    def conditional(gate: str) -> QuantumCircuit:
+        qc = QuantumCircuit(2, 1)
+        qc.measure(0, 0)
+        with qc.if_test((qc.clbits[0], 1)):
+            getattr(qc, gate)(1)
+        return qc
+    assert fingerprint(conditional("x")) != fingerprint(conditional("z"))
+
+def test_condition_value_changes_the_fingerprint():
+    def conditional(value: int) -> QuantumCircuit:
+        qc = QuantumCircuit(2, 1)
+        qc.measure(0, 0)
+        with qc.if_test((qc.clbits[0], value)):
+            qc.x(1)
+        return qc
+    assert fingerprint(conditional(0)) != fingerprint(conditional(1))
+
+def test_switch_case_labels_change_the_fingerprint():
+    def switched(value: int) -> QuantumCircuit:
+        qc = QuantumCircuit(2, 1)
+        qc.measure(0, 0)
+        with qc.switch(qc.clbits[0]) as case:
+            with case(value):
+                qc.x(1)
+        return qc
+    assert fingerprint(switched(0)) != fingerprint(switched(1))
+
+@pytest.mark.parametrize("text, backend_type", [("OPENQASM 2.0; qreg q[1]; bogus q[0];", "qiskit"), ("{not json", "cirq")])
+def test_malformed_circuit_text_raises_value_error(text, backend_type):
+    with pytest.raises(ValueError):
+        parse_circuit(text, backend_type)
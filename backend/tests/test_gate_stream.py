@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import pytest
+
+pytest.importorskip("json5")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.gate_stream import IncrementalGateParser
+
+RESPONSE = {
+    "Parameters": [{"n": 2, "p": 0.5}],
+    "gates": [
+        {"gate": "H", "qubit": 0, "note": "braces } ] and \"quotes\" in strings"},
+        {"gate": "CX", "control_qubit": [0], "target_qubit": 1},
+        {"gate": "RY", "qubit": 1, "angle": "acos(sqrt(p))"},
+    ],
+    "explanation": "trailing {text} after the gates"
+}
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 10000])
+def test_gates_are_emitted_whatever_the_chunking(chunk_size):
+    text = json.dumps(RESPONSE)
+    parser = IncrementalGateParser()
+    gates = []
+    for start in range(0, len(text), chunk_size):
+        gates += parser.feed(text[start:start + chunk_size])
+    assert gates == RESPONSE["gates"]
+    assert parser.parameters == RESPONSE["Parameters"]
+    assert parser.done and parser.text == text
+
+def test_each_gate_is_emitted_as_soon_as_it_closes():
+    parser = IncrementalGateParser()
+    assert parser.feed('Here you go: {"Parameters": [{"n": 1}], "gates": [{"gate": "H", "qu') == []
+    assert parser.feed('bit": 0}, {"gate"') == [{"gate": "H", "qubit": 0}]
+    assert parser.feed(': "X", qubit: 0,}]') == [{"gate": "X", "qubit": 0}]
+    assert parser.done
+
+def test_unparseable_gate_is_recorded_and_skipped():
+    parser = IncrementalGateParser()
+    gates = parser.feed('{"gates": [{"gate": "H" "qubit": 0}, {"gate": "X", "qubit": 1}]}')
+    assert gates == [{"gate": "X", "qubit": 1}]
+    assert len(parser.errors) == 1 and parser.errors[0].startswith("gate 0")
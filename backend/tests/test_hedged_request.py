@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+import sys
+import pytest
+
+for module in ("httpx", "dotenv", "langchain", "langchain_groq", "qiskit"):
+    pytest.importorskip(module)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from fastapi.exceptions import HTTPException
+from services.llm_backends import Completion, LLMBackend
+from services.llm_cache import LLMResponseCache
+from services.quirk_circuit_generator import QuantumLLM
+
+class ScriptedBackend(LLMBackend):
+    """Answers attempt i after plan[i][0] seconds with a clean, dirty or unparseable response."""
+    name = "scripted"
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.started = 0
+        self.cancelled = 0
+
+    async def generate(self, statement: str, messages: list, **params) -> Completion:
+        delay, kind = self.plan[self.started]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return Completion("not json" if kind == "bad" else json.dumps({"gates": [kind]}))
+
+def validate(response):
+    return response, response["gates"][0] == "clean"
+
+def hedge(plan, cache=None, **kwargs):
+    backend = ScriptedBackend(plan)
+    llm = QuantumLLM(backend=backend, cache=cache)
+    async def run():
+        result = await llm.hedged_request("statement", validate, **kwargs)
+        await asyncio.sleep(0.01)
+        return result
+    return backend, asyncio.run(run())
+
+def test_first_clean_response_wins_and_losers_are_cancelled():
+    backend, (response, _) = hedge([(0.3, "clean"), (0.05, "bad"), (0.1, "clean")], hedges=3)
+    assert response == {"gates": ["clean"]}
+    assert backend.started == 3 and backend.cancelled == 1
+
+def test_hedge_delay_starts_the_next_attempt_only_when_the_first_is_slow():
+    backend, _ = hedge([(0.02, "clean"), (0.02, "clean")], hedges=2, hedge_delay=0.2)
+    assert backend.started == 1
+    backend, (response, _) = hedge([(1.0, "clean"), (0.05, "clean")], hedges=2, hedge_delay=0.1)
+    assert backend.started == 2 and backend.cancelled == 1 and response == {"gates": ["clean"]}
+
+def test_dirty_response_is_the_fallback_when_nothing_is_clean():
+    _, (response, _) = hedge([(0.05, "dirty"), (0.1, "bad")], hedges=2)
+    assert response == {"gates": ["dirty"]}
+
+def test_all_failures_raise():
+    with pytest.raises(HTTPException):
+        hedge([(0.01, "bad"), (0.02, "bad")], hedges=2)
+
+def test_only_the_winner_is_cached_and_reused():
+    cache = LLMResponseCache(cache_dir=None)
+    hedge([(0.05, "clean"), (0.01, "dirty")], cache=cache, hedges=2)
+    backend, (response, _) = hedge([(0.01, "bad")], cache=cache, hedges=1)
+    assert backend.started == 0 and response == {"gates": ["clean"]}
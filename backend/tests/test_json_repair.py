@@ -0,0 +1,27 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("orjson")
+pytest.importorskip("json5")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.json_repair import parse_llm_json, repair_json
+
+@pytest.mark.parametrize("fragment, expected", [
+    ('{"gates": [{"gate": "RX", "angle": 1.', {"gates": [{"gate": "RX", "angle": 1}]}),
+    ('{"angle": 1.5e', {"angle": 1.5}),
+    ('{"angle": 2e-', {"angle": 2}),
+    ('{"angle": -', {"angle": None}),
+    ('{"gates": [1, -', {"gates": [1]}),
+    ('{"angle": 1e5', {"angle": 100000.0}),
+])
+def test_truncated_numbers_are_completed_or_dropped(fragment, expected):
+    assert parse_llm_json(fragment) == expected
+
+def test_truncated_string_that_looks_like_a_number_is_kept():
+    assert parse_llm_json('{"angle": "1.') == {"angle": "1."}
+
+def test_common_defects_are_repaired():
+    text = "Here you go: {gates: [{'gate': 'H', 'qubit': 0,},], 'ok': True} Note {p}"
+    assert parse_llm_json(text) == {"gates": [{"gate": "H", "qubit": 0}], "ok": True}
+    assert repair_json('{"a": [1, 2') == '{"a": [1, 2]}'
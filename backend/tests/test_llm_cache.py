@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services import llm_cache
+from services.llm_cache import LLMResponseCache, normalize_statement
+
+def key(statement: str, template_version: str = "2") -> str:
+    return LLMResponseCache.make_key(statement, template_version, "model", 0.0, 1024)
+
+def test_trivially_different_statements_share_a_key():
+    assert normalize_statement("  Build a  GHZ state on 3 qubits!\n") == "build a ghz state on 3 qubits"
+    assert key("Build a GHZ state on 3 qubits.") == key("build a ghz   state on 3 qubits")
+    assert key("Build a GHZ state on 3 qubits") != key("Build a GHZ state on 3 qubits", template_version="3")
+
+def test_entries_are_copied_on_put_and_get():
+    cache = LLMResponseCache(cache_dir=None)
+    value = {"gates": [{"gate": "H", "qubit": 0}]}
+    cache.put("k", value)
+    value["gates"].append({"gate": "X", "qubit": 0})
+    cache.get("k")["gates"].clear()
+    assert cache.get("k") == {"gates": [{"gate": "H", "qubit": 0}]}
+    assert (cache.hits, cache.misses) == (2, 0)
+
+def test_expired_entries_are_misses(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = LLMResponseCache(cache_dir=None, ttl=60)
+    cache.put("k", {"gates": []})
+    now[0] += 61
+    assert cache.get("k") is None and cache.misses == 1
+
+def test_disk_entries_survive_a_restart_and_bad_files_are_misses(tmp_path):
+    LLMResponseCache(cache_dir=str(tmp_path)).put("k", {"gates": [{"gate": "H", "qubit": 0}]})
+    restarted = LLMResponseCache(cache_dir=str(tmp_path))
+    assert restarted.get("k") == {"gates": [{"gate": "H", "qubit": 0}]}
+    (tmp_path / "bad.json").write_text("{truncated", encoding="utf-8")
+    assert restarted.get("bad") is None
+
+def test_lru_evicts_the_least_recently_used_entry():
+    cache = LLMResponseCache(max_entries=2, cache_dir=None)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+    assert cache.get("b") is None and cache.get("a") == {} and cache.get("c") == {}
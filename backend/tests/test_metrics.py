@@ -0,0 +1,55 @@
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services import metrics
+from services.metrics import (HISTOGRAMS, Histogram, current_request_timings, merge_request_timings, observe,
+                              render_metrics, server_timing_header, start_request_timings, timed)
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    histogram = Histogram("demo_seconds", "Demo", (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.render().splitlines() == [
+        "# HELP demo_seconds Demo",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 2',
+        'demo_seconds_bucket{le="1"} 3',
+        'demo_seconds_bucket{le="+Inf"} 4',
+        "demo_seconds_sum 5.650000",
+        "demo_seconds_count 4",
+    ]
+
+def test_stages_sum_per_request_and_feed_the_histograms():
+    async def request():
+        timings = start_request_timings()
+        before = HISTOGRAMS["llm"].count
+        observe("llm", 0.25)
+        observe("llm", 0.5)
+        observe("prompt_tokens", 120)
+        with timed("parse"):
+            pass
+        return timings, HISTOGRAMS["llm"].count - before
+    timings, observed = asyncio.run(request())
+    assert observed == 2 and timings["llm"] == 0.75 and timings["prompt_tokens"] == 120 and "parse" in timings
+
+def test_server_timing_reports_durations_in_milliseconds_without_token_counts():
+    header = server_timing_header({"ttft": 0.1, "llm": 0.8125, "prompt_tokens": 900, "db": 0.002})
+    assert header == "ttft;dur=100.0, llm;dur=812.5, db;dur=2.0"
+
+def test_merged_leader_timings_fill_missing_stages_without_observing():
+    async def follower():
+        timings = start_request_timings()
+        observe("db", 0.01)
+        before = HISTOGRAMS["llm"].count
+        merge_request_timings({"llm": 1.5, "db": 0.5, "build": 0.02})
+        return timings, current_request_timings(), HISTOGRAMS["llm"].count - before
+    timings, snapshot, observed = asyncio.run(follower())
+    assert timings == {"db": 0.01, "llm": 1.5, "build": 0.02} and snapshot == timings and observed == 0
+
+def test_metrics_output_lists_every_stage():
+    text = render_metrics()
+    for name, _, _, _ in metrics.STAGES.values():
+        assert f"# TYPE {name} histogram" in text and f'{name}_bucket{{le="+Inf"}}' in text
+    assert text.endswith("\n")
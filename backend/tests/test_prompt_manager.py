@@ -0,0 +1,38 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.prompt_manager import CORE_GATES, QuantumPrompt, estimate_tokens
+
+STATEMENT = "Build a quantum fourier transform with phase rotations on 3 qubits"
+
+def test_generous_budget_keeps_everything_and_counts_exactly():
+    prompt = QuantumPrompt.compile(STATEMENT, budget=100000)
+    assert prompt.sections == ("example", "keys")
+    assert "QFT2" in prompt.gates and set(CORE_GATES) <= set(prompt.gates)
+    assert STATEMENT in prompt.text
+    assert prompt.token_count == estimate_tokens(prompt.text)
+
+@pytest.mark.parametrize("budget", [1000, 800, 700, 600])
+def test_prompt_fits_the_budget_when_the_core_fits(budget):
+    prompt = QuantumPrompt.compile(STATEMENT, budget=budget)
+    assert prompt.token_count <= budget
+    assert prompt.token_count == estimate_tokens(prompt.text)
+
+def test_optional_sections_go_before_retrieved_gates_and_core_gates_stay():
+    full = QuantumPrompt.compile(STATEMENT, budget=100000)
+    without_sections = QuantumPrompt.compile(STATEMENT, budget=700)
+    assert without_sections.sections == () and without_sections.gates == full.gates
+    minimal = QuantumPrompt.compile(STATEMENT, budget=1)
+    assert minimal.gates == CORE_GATES and minimal.sections == ()
+
+def test_reserved_tokens_shrink_the_room_for_optional_sections():
+    assert QuantumPrompt.compile(STATEMENT, budget=1000).sections == ("example", "keys")
+    reserved = QuantumPrompt.compile(STATEMENT, budget=1000, reserved_tokens=300)
+    assert "example" not in reserved.sections
+
+def test_keywords_retrieve_only_relevant_palette_gates():
+    assert QuantumPrompt.relevant_gates("Prepare a Bell pair") == list(CORE_GATES)
+    assert "QFT3" in QuantumPrompt.relevant_gates("Run a QFT")
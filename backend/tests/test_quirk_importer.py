@@ -0,0 +1,39 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("qiskit")
+pytest.importorskip("cirq")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.quirk_importer import QuirkImporter
+
+def test_multi_row_gate_widens_circuit():
+    circuit, diagnostics = QuirkImporter().parse('{"cols":[["QFT3"],["H",1,"QFT2"]]}')
+    assert circuit.num_qubits == 4
+    assert diagnostics == []
+
+@pytest.mark.parametrize("source", ["5", '"cols"', '{"cols": 5}', "not json", '{"cols": [["H"], "X"]}'])
+def test_malformed_input_raises_value_error(source):
+    with pytest.raises(ValueError):
+        QuirkImporter().parse(source)
+
+def test_unreadable_entries_are_error_diagnostics():
+    _, diagnostics = QuirkImporter().parse('{"cols":[[{"foo": 1}]]}')
+    assert [item["level"] for item in diagnostics] == ["error"]
+
+@pytest.mark.parametrize("source", [
+    'https://algassert.com/quirk#circuit={%22cols%22:[[%22H%22],[%22%E2%80%A2%22,%22X%22]]}',
+    'https://algassert.com/quirk#circuit=%7B%22cols%22%3A%5B%5B%22H%22%5D%2C%5B%22%E2%80%A2%22%2C%22X%22%5D%5D%7D',
+])
+def test_quirk_share_links_are_decoded(source):
+    circuit, diagnostics = QuirkImporter().parse(source)
+    assert [instr.operation.name for instr in circuit.data][:2] == ["h", "cx"]
+    assert diagnostics == []
+
+def test_short_link_hash_accepts_only_the_stored_hash_format():
+    from services.quirk_payload import quirk_payload_hash, quirk_short_link_hash
+    quirk_hash = quirk_payload_hash('[[["H",[0]]]]')
+    assert quirk_short_link_hash(quirk_hash) == quirk_hash
+    assert quirk_short_link_hash(f"https://deqcode.example/q/{quirk_hash}/") == quirk_hash
+    assert quirk_short_link_hash("https://deqcode.example/q/not-a-hash") is None
+    assert quirk_short_link_hash('{"cols":[[]]}') is None
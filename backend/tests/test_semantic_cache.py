@@ -0,0 +1,48 @@
+import os
+import sys
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("qiskit")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.semantic_cache import SemanticCache
+
+def cache_with(statement: str, **kwargs) -> SemanticCache:
+    cache = SemanticCache(path=kwargs.pop("path", None), **kwargs)
+    cache.add(statement, {"statement": statement})
+    return cache
+
+def test_paraphrase_is_served_from_cache():
+    hit = cache_with("Prepare a GHZ state on 4 qubits").lookup("prepare GHZ state with 4 qubits")
+    assert hit is not None and hit[0] == {"statement": "Prepare a GHZ state on 4 qubits"}
+
+@pytest.mark.parametrize("cached, requested", [
+    ("quantum fourier transform on 4 qubits", "inverse quantum fourier transform on 4 qubits"),
+    ("rotate qubit 0 around x by 0.5", "rotate qubit 0 around y by 0.5"),
+    ("apply x to qubit 1", "apply controlled x to qubit 1"),
+    ("Prepare a GHZ state on 4 qubits", "Prepare a GHZ state on 5 qubits"),
+])
+def test_near_misses_are_not_served(cached, requested):
+    # A threshold of zero shows the key-term and number guards reject these on their own
+    assert cache_with(cached, threshold=0.0).lookup(requested) is None
+
+def test_file_stops_growing_at_max_entries(tmp_path):
+    path = str(tmp_path / "semantic.jsonl")
+    cache = SemanticCache(path=path, max_entries=2)
+    for n in range(5):
+        cache.add(f"Prepare a GHZ state on {n} qubits", {"n": n})
+    with open(path, encoding="utf-8") as handle:
+        assert len(handle.readlines()) == 2
+    reloaded = SemanticCache(path=path).load()
+    assert len(reloaded) == 2
+    assert reloaded.lookup("Prepare a GHZ state on 1 qubits")[0] == {"n": 1}
+
+def test_results_are_copied_on_add_and_lookup():
+    result = {"Response": {"gates": [{"gate": "H", "qubit": 0}]}}
+    cache = SemanticCache(path=None)
+    cache.add("Prepare a GHZ state on 2 qubits", result)
+    result["Response"]["gates"].append({"gate": "X", "qubit": 1})
+    first, _ = cache.lookup("Prepare a GHZ state on 2 qubits")
+    first["Response"]["gates"].clear()
+    second, _ = cache.lookup("Prepare a GHZ state on 2 qubits")
+    assert second == {"Response": {"gates": [{"gate": "H", "qubit": 0}]}}
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from services.single_flight import SingleFlight
+
+def counting_factory(calls, result="result", delay=0.05, error=None):
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+    return factory
+
+def test_concurrent_calls_with_the_same_key_share_one_task():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        results = await asyncio.gather(*(flight.do("k", counting_factory(calls)) for _ in range(5)))
+        other = await flight.do("other", counting_factory(calls, "other"))
+        return flight, calls, results, other
+    flight, calls, results, other = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == "result" for result, _ in results) and other == ("other", False)
+    assert flight.coalesced == 4
+
+def test_key_is_free_again_once_the_task_finishes():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        first = await flight.do("k", counting_factory(calls, delay=0))
+        await asyncio.sleep(0)
+        second = await flight.do("k", counting_factory(calls, delay=0))
+        return calls, first, second
+    calls, first, second = asyncio.run(scenario())
+    assert len(calls) == 2 and first == second == ("result", False)
+
+def test_errors_reach_every_waiter():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        factory = counting_factory(calls, error=ValueError("boom"))
+        return calls, await asyncio.gather(flight.do("k", factory), flight.do("k", factory), return_exceptions=True)
+    calls, outcomes = asyncio.run(scenario())
+    assert len(calls) == 1 and all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_task():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+        leader = asyncio.ensure_future(flight.do("k", counting_factory(calls, delay=0.1)))
+        follower = asyncio.ensure_future(flight.do("k", counting_factory(calls, delay=0.1)))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return calls, await follower
+    calls, follower_result = asyncio.run(scenario())
+    assert len(calls) == 1 and follower_result == ("result", True)